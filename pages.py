@@ -1,17 +1,26 @@
 import streamlit as st
 import os
+import shutil
 import tempfile
 import zipfile
 from io import BytesIO
 from tools import (
-    pptx_to_png,
-    pdf_to_png,
-    pptx_to_pdf,
-    m4a_to_mp3,
-    mp4_to_mp3,
-    audio_to_subtitle,
+    cached_iter_pptx_to_png_bytes,
+    cached_pdf_to_png,
+    cached_pptx_to_pdf,
+    pptx_to_pdf_batch,
+    cached_m4a_to_mp3,
+    cached_mp4_to_mp3,
+    cached_audio_to_subtitle,
+    get_conversion_cache,
 )
-from tools import process_srt_file
+from tools import (
+    process_srt_content,
+    get_transcription_backend,
+    get_client,
+    SegmentLimits,
+)
+from tools import get_translation_memory
 from dotenv import load_dotenv
 
 # Load environment variables from .env if present
@@ -26,9 +35,34 @@ def get_temp_dir():
     return temp_dir
 
 
+@st.cache_resource
+def get_local_transcription_backend(workers):
+    """Load the local Whisper model once per process"""
+    return get_transcription_backend("local", num_workers=workers)
+
+
+def show_cache_stats():
+    """Show the conversion cache hit/miss counters under a conversion result."""
+    stats = get_conversion_cache().stats()
+    st.caption(
+        f"Conversion cache: {stats['hits']} hit(s), {stats['misses']} miss(es) "
+        f"({stats['hit_ratio']:.0%} hit ratio), {stats['entries']} entries, "
+        f"{stats['bytes'] / (1024 * 1024):.1f} of {stats['max_bytes'] / (1024 * 1024):.0f} MB"
+    )
+
+
+def show_translation_memory_stats():
+    """Show the translation memory hit/miss counters under a translation result."""
+    stats = get_translation_memory().stats()
+    st.caption(
+        f"Translation memory: {stats['hits']} hit(s), {stats['misses']} miss(es) "
+        f"({stats['hit_ratio']:.0%} hit ratio), {stats['entries']} entries, "
+        f"{stats['bytes'] / (1024 * 1024):.1f} of {stats['max_bytes'] / (1024 * 1024):.0f} MB"
+    )
+
+
 def chat_llm_page():
     st.header("Chat with LLM (Bailian Aliyun)")
-    from openai import OpenAI
 
     # Check if API key is available
     api_key = os.getenv("DASHSCOPE_API_KEY")
@@ -56,10 +90,7 @@ def chat_llm_page():
 
         # Use Bailian Aliyun DashScope API
         try:
-            client = OpenAI(
-                api_key=api_key,
-                base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-            )
+            client = get_client("dashscope", api_key=api_key)
             response = client.chat.completions.create(
                 model="qwen-max",  # or your preferred DashScope model
                 messages=messages,
@@ -85,6 +116,13 @@ def chat_llm_page():
 def pdf_to_png_page():
     st.header("PDF to PNG Converter")
     uploaded_file = st.file_uploader("Upload a PDF file", type=["pdf"])
+    workers = st.number_input(
+        "Number of parallel render workers",
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=min(4, os.cpu_count() or 1),
+        key="pdf_to_png_workers",
+    )
 
     if uploaded_file is not None:
         # Use temporary file for processing
@@ -96,9 +134,12 @@ def pdf_to_png_page():
             try:
                 # Create temporary output directory
                 temp_output_dir = tempfile.mkdtemp()
-                png_files = pdf_to_png(temp_pdf_path, temp_output_dir)
+                png_files = cached_pdf_to_png(
+                    temp_pdf_path, temp_output_dir, workers=int(workers)
+                )
 
                 st.success(f"Converted {len(png_files)} page(s) to PNG.")
+                show_cache_stats()
 
                 # Create zip file with all PNGs for bulk download
                 zip_buffer = BytesIO()
@@ -143,8 +184,15 @@ def pdf_to_png_page():
 
 def pptx_to_pdf_page():
     st.header("PPTX to PDF Converter")
-    uploaded_file = st.file_uploader("Upload a PPTX file", type=["pptx"])
+    uploaded_files = st.file_uploader(
+        "Upload one or more PPTX files", type=["pptx"], accept_multiple_files=True
+    )
 
+    if len(uploaded_files) > 1:
+        pptx_to_pdf_batch_section(uploaded_files)
+        return
+
+    uploaded_file = uploaded_files[0] if uploaded_files else None
     if uploaded_file is not None:
         # Use temporary file for processing
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pptx") as temp_pptx:
@@ -155,9 +203,10 @@ def pptx_to_pdf_page():
             try:
                 # Create temporary output directory
                 temp_output_dir = tempfile.mkdtemp()
-                pdf_file = pptx_to_pdf(temp_pptx_path, temp_output_dir)
+                pdf_file = cached_pptx_to_pdf(temp_pptx_path, temp_output_dir)
 
                 st.success(f"Converted to PDF: {os.path.basename(pdf_file)}")
+                show_cache_stats()
 
                 # Provide download
                 with open(pdf_file, "rb") as pdf_f:
@@ -182,11 +231,74 @@ def pptx_to_pdf_page():
                     os.remove(temp_pptx_path)
 
 
+def pptx_to_pdf_batch_section(uploaded_files):
+    workers = st.number_input(
+        "Number of parallel LibreOffice workers",
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=min(2, os.cpu_count() or 1),
+        key="pptx_to_pdf_workers",
+    )
+
+    if st.button(f"Convert {len(uploaded_files)} files to PDF"):
+        # Keep the uploaded names so the PDFs inside the ZIP are named after them
+        temp_input_dir = tempfile.mkdtemp()
+        temp_output_dir = tempfile.mkdtemp()
+        try:
+            pptx_paths = []
+            for i, uploaded_file in enumerate(uploaded_files):
+                upload_dir = os.path.join(temp_input_dir, str(i))
+                os.makedirs(upload_dir)
+                pptx_path = os.path.join(upload_dir, os.path.basename(uploaded_file.name))
+                with open(pptx_path, "wb") as pptx_f:
+                    pptx_f.write(uploaded_file.getbuffer())
+                pptx_paths.append(pptx_path)
+
+            with st.spinner("Converting presentations..."):
+                results = pptx_to_pdf_batch(
+                    pptx_paths, temp_output_dir, workers=int(workers)
+                )
+
+            converted = [r for r in results if r["output"]]
+            failed = [r for r in results if r["error"]]
+            if converted:
+                st.success(f"Converted {len(converted)} of {len(results)} file(s) to PDF.")
+            for result in failed:
+                st.error(
+                    f"{os.path.basename(result['input'])}: {result['error']}"
+                )
+
+            if converted:
+                zip_buffer = BytesIO()
+                with zipfile.ZipFile(zip_buffer, "w") as zip_file:
+                    for result in converted:
+                        zip_file.write(result["output"], os.path.basename(result["output"]))
+                st.download_button(
+                    label="Download All PDF Files (ZIP)",
+                    data=zip_buffer.getvalue(),
+                    file_name="converted_pdfs.zip",
+                    mime="application/zip",
+                )
+
+        except Exception as e:
+            st.error(f"Conversion failed: {str(e)}")
+        finally:
+            shutil.rmtree(temp_input_dir, ignore_errors=True)
+            shutil.rmtree(temp_output_dir, ignore_errors=True)
+
+
 def pptx_to_png_page():
     st.header("PPTX to PNG Converter")
     uploaded_file = st.file_uploader(
         "Upload a PPTX file", type=["pptx"], key="pptx_to_png_uploader"
     )
+    workers = st.number_input(
+        "Number of parallel render workers",
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=min(4, os.cpu_count() or 1),
+        key="pptx_to_png_workers",
+    )
 
     if uploaded_file is not None:
         # Use temporary file for processing
@@ -196,32 +308,32 @@ def pptx_to_png_page():
 
         if st.button("Convert to PNG"):
             try:
-                # Create temporary output directory
-                temp_output_dir = tempfile.mkdtemp()
-                png_files = pptx_to_png(temp_pptx_path, temp_output_dir)
-
-                st.success(f"Converted {len(png_files)} slide(s) to PNG.")
+                pptx_base_name = os.path.splitext(uploaded_file.name)[0]
+                slide_count = 0
 
-                # Create zip file with all PNGs for bulk download
+                # Each slide is rendered and encoded once; the same bytes feed the
+                # ZIP, the preview and the download button without touching the disk
                 zip_buffer = BytesIO()
                 with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-                    for png_file in png_files:
-                        zip_file.write(png_file, os.path.basename(png_file))
-
-                # Display images and provide individual downloads
-                for png_file in png_files:
-                    st.image(png_file, caption=os.path.basename(png_file), width=400)
-                    with open(png_file, "rb") as img_f:
+                    for slide_number, png_bytes in cached_iter_pptx_to_png_bytes(
+                        temp_pptx_path, workers=int(workers)
+                    ):
+                        png_name = f"{pptx_base_name}_page_{slide_number}.png"
+                        zip_file.writestr(png_name, png_bytes)
+                        st.image(png_bytes, caption=png_name, width=400)
                         st.download_button(
-                            label=f"Download {os.path.basename(png_file)}",
-                            data=img_f.read(),
-                            file_name=os.path.basename(png_file),
+                            label=f"Download {png_name}",
+                            data=png_bytes,
+                            file_name=png_name,
                             mime="image/png",
-                            key=f"download_pptx_{os.path.basename(png_file)}",
+                            key=f"download_pptx_{png_name}",
                         )
+                        slide_count += 1
+
+                st.success(f"Converted {slide_count} slide(s) to PNG.")
+                show_cache_stats()
 
                 # Bulk download button
-                pptx_base_name = os.path.splitext(uploaded_file.name)[0]
                 st.download_button(
                     label="Download All PNG Files (ZIP)",
                     data=zip_buffer.getvalue(),
@@ -229,12 +341,6 @@ def pptx_to_png_page():
                     mime="application/zip",
                 )
 
-                # Clean up temporary files
-                for png_file in png_files:
-                    if os.path.exists(png_file):
-                        os.remove(png_file)
-                os.rmdir(temp_output_dir)
-
             except Exception as e:
                 st.error(f"Conversion failed: {str(e)}")
             finally:
@@ -261,8 +367,9 @@ def m4a_to_mp3_page():
                 ) as temp_mp3:
                     temp_mp3_path = temp_mp3.name
 
-                result_mp3 = m4a_to_mp3(temp_m4a_path, temp_mp3_path)
+                result_mp3 = cached_m4a_to_mp3(temp_m4a_path, temp_mp3_path)
                 st.success(f"Converted to MP3: {uploaded_file.name}")
+                show_cache_stats()
 
                 # Provide download
                 with open(result_mp3, "rb") as mp3_f:
@@ -304,8 +411,9 @@ def mp4_to_mp3_page():
                 ) as temp_mp3:
                     temp_mp3_path = temp_mp3.name
 
-                result_mp3 = mp4_to_mp3(temp_mp4_path, temp_mp3_path)
+                result_mp3 = cached_mp4_to_mp3(temp_mp4_path, temp_mp3_path)
                 st.success(f"Converted to MP3: {uploaded_file.name}")
+                show_cache_stats()
 
                 # Provide download
                 with open(result_mp3, "rb") as mp3_f:
@@ -343,6 +451,12 @@ def audio_to_subtitle_page():
 
     # Configuration options
     st.subheader("Configuration")
+    backend_name = st.selectbox(
+        "Transcription backend",
+        options=["OpenAI Whisper API", "Local (faster-whisper, CPU)"],
+        index=0,
+        help="The local backend runs an int8-quantized Whisper model on this machine and needs the faster-whisper package",
+    )
     chunk_length_minutes = st.slider(
         "Audio chunk length (minutes)",
         min_value=1,
@@ -351,6 +465,20 @@ def audio_to_subtitle_page():
         help="Longer chunks may be more accurate but will take longer to process and may hit API limits",
     )
 
+    workers = st.slider(
+        "Concurrent transcription requests",
+        min_value=1,
+        max_value=16,
+        value=4,
+        help="Chunks are sent to the API in parallel; lower this if you hit rate limits",
+    )
+
+    silence_aware = st.checkbox(
+        "Cut chunks at pauses in speech",
+        value=True,
+        help="Moves each chunk boundary into nearby silence so words and sentences are not split",
+    )
+
     # OpenAI API Key input (optional)
     api_key = st.text_input(
         "OpenAI API Key (optional)",
@@ -376,15 +504,36 @@ def audio_to_subtitle_page():
                 "Converting audio/video to subtitles... This may take a while for long files."
             ):
                 try:
+                    # Show progress and the subtitles transcribed so far while the job runs
+                    progress_bar = st.progress(0.0, text="Transcribing...")
+                    partial_preview = st.empty()
+
+                    def show_progress(finished, planned, partial_srt):
+                        progress_bar.progress(
+                            finished / planned,
+                            text=f"Transcribed {finished} of {planned} chunk(s) planned so far",
+                        )
+                        partial_preview.text(partial_srt[-2000:])
+
                     # Convert to subtitles
                     chunk_length_ms = chunk_length_minutes * 60 * 1000
-                    srt_content = audio_to_subtitle(
+                    backend = None
+                    if backend_name != "OpenAI Whisper API":
+                        backend = get_local_transcription_backend(workers)
+                    srt_content = cached_audio_to_subtitle(
                         temp_file_path,
                         chunk_length_ms=chunk_length_ms,
                         api_key=api_key if api_key.strip() else None,
+                        workers=workers,
+                        silence_aware=silence_aware,
+                        progress_callback=show_progress,
+                        backend=backend,
                     )
+                    progress_bar.empty()
+                    partial_preview.empty()
 
                     st.success(f"Subtitles generated successfully!")
+                    show_cache_stats()
 
                     # Display preview of subtitles
                     st.subheader("Subtitle Preview")
@@ -407,7 +556,10 @@ def audio_to_subtitle_page():
 
                 except Exception as e:
                     st.error(f"Subtitle generation failed: {e}")
-                    st.error("Please check your OpenAI API key and try again.")
+                    st.error(
+                        "Please check your OpenAI API key and try again. "
+                        "Chunks that were already transcribed are kept and will not be sent again."
+                    )
                 finally:
                     # Clean up temporary file
                     if os.path.exists(temp_file_path):
@@ -472,7 +624,33 @@ def combined_srt_page():
             )
 
         workers = st.number_input(
-            "Number of concurrent workers", min_value=1, max_value=50, value=5
+            "Maximum concurrent requests",
+            min_value=1,
+            max_value=50,
+            value=5,
+            help="Concurrency adapts to the provider's rate limits up to this value",
+        )
+        batch_size = st.number_input(
+            "Subtitle blocks per request",
+            min_value=1,
+            max_value=50,
+            value=1,
+            help="Translate several blocks in one request to cut request count; "
+            "mismatched replies fall back to one request per block",
+        )
+        context_cues = st.number_input(
+            "Neighbouring subtitles sent as context",
+            min_value=0,
+            max_value=10,
+            value=0,
+            help="Send this many source subtitles before and after each request as "
+            "read-only context, so sentences split across subtitles translate smoothly",
+        )
+        use_memory = st.checkbox(
+            "Reuse earlier translations",
+            value=True,
+            help="Lines already translated with the same language, model and provider "
+            "are taken from the local translation memory instead of the API",
         )
 
         # Show info about automatic resegmentation
@@ -485,6 +663,9 @@ def combined_srt_page():
         provider = "dashscope"
         model = None
         workers = 5
+        batch_size = 1
+        context_cues = 0
+        use_memory = False
 
     # Resegmentation settings (show for resegment and translate operations)
     if operation_value in ["resegment", "translate", "both"]:
@@ -496,6 +677,22 @@ def combined_srt_page():
             value=125,
             step=5,
         )
+        max_duration = st.number_input(
+            "Maximum seconds per segment (0 = no limit)",
+            min_value=0.0,
+            max_value=60.0,
+            value=0.0,
+            step=0.5,
+            help="Longer cues are split and shorter ones are not merged past this length",
+        )
+        max_cps = st.number_input(
+            "Maximum reading speed in characters per second (0 = no limit)",
+            min_value=0.0,
+            max_value=50.0,
+            value=0.0,
+            step=1.0,
+            help="Cues are not merged into segments that would read faster than this",
+        )
         if operation_value == "translate":
             st.info(
                 "ℹ️ This setting controls how the SRT is resegmented before translation."
@@ -503,19 +700,20 @@ def combined_srt_page():
     else:
         # Default value when resegmentation is not needed
         max_chars = 125
+        max_duration = 0.0
+        max_cps = 0.0
 
     if uploaded_file is not None:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".srt") as temp_srt:
-            temp_srt.write(uploaded_file.getbuffer())
-            temp_srt_path = temp_srt.name
-
         button_text = f"Process SRT ({operation})"
         if st.button(button_text, key="combined_srt_button"):
             try:
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=".srt"
-                ) as temp_output:
-                    output_srt_path = temp_output.name
+                # Processed in memory: same newline handling as reading the file in text mode
+                srt_content = (
+                    uploaded_file.getvalue()
+                    .decode("utf-8")
+                    .replace("\r\n", "\n")
+                    .replace("\r", "\n")
+                )
 
                 # Determine router based on provider selection
                 if provider == "OpenAI":
@@ -525,21 +723,58 @@ def combined_srt_page():
                 else:
                     router = "dashscope"
 
-                process_srt_file(
-                    temp_srt_path,
-                    output_srt_path,
+                # Show translation progress while requests complete
+                progress_bar = st.progress(0.0, text="Processing...")
+
+                def show_progress(progress):
+                    eta = (
+                        f", about {progress.eta_s:.0f}s left"
+                        if progress.eta_s is not None
+                        else ""
+                    )
+                    cached = (
+                        f" ({progress.cached_tokens} cached)"
+                        if progress.cached_tokens
+                        else ""
+                    )
+                    progress_bar.progress(
+                        progress.done / progress.total if progress.total else 1.0,
+                        text=f"Translated {progress.done} of {progress.total} block(s), "
+                        f"{progress.tokens} tokens{cached}{eta}",
+                    )
+
+                issues = []
+                result_content = process_srt_content(
+                    srt_content,
                     operation=operation_value,
                     max_chars=int(max_chars),
                     target_lang=target_lang,
                     model=model or None,
                     workers=workers,
                     router=router,
+                    batch_size=int(batch_size),
+                    use_memory=use_memory,
+                    progress_callback=show_progress,
+                    issues=issues,
+                    limits=SegmentLimits(
+                        max_duration_ms=int(max_duration * 1000) or None,
+                        max_chars_per_second=max_cps or None,
+                    ),
+                    context_cues=int(context_cues),
                 )
+                progress_bar.empty()
+                if issues:
+                    st.warning(
+                        f"{len(issues)} malformed cue(s) were repaired or skipped:\n\n"
+                        + "\n".join(
+                            f"- line {issue.line}: {issue.message}"
+                            for issue in issues[:20]
+                        )
+                    )
 
                 st.success(f"Processing complete! ({operation})")
-
-                with open(output_srt_path, "r", encoding="utf-8") as srt_f:
-                    result_content = srt_f.read()
+                if use_memory:
+                    show_translation_memory_stats()
 
                 srt_base_name = os.path.splitext(uploaded_file.name)[0]
 
@@ -561,14 +796,8 @@ def combined_srt_page():
                     mime="text/plain",
                 )
 
-                if os.path.exists(output_srt_path):
-                    os.remove(output_srt_path)
-
             except Exception as e:
                 st.error(f"Processing failed: {e}")
-            finally:
-                if os.path.exists(temp_srt_path):
-                    os.remove(temp_srt_path)
 
 
 def home_page():
@@ -0,0 +1,46 @@
+import importlib
+
+import numpy as np
+import pytest
+
+# tools re-exports the audio_to_subtitle function under the module's name
+module = importlib.import_module("tools.audio_to_subtitle")
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    """Make silence analysis see 100 frames of noise, in blocks of 30."""
+    rng = np.random.default_rng(0)
+    energy = rng.random(100).astype(np.float32)
+
+    def fake_iter_frame_rms(file_path, frame_ms=module.ANALYSIS_FRAME_MS):
+        for start in range(0, len(energy), 30):
+            yield energy[start : start + 30]
+
+    monkeypatch.setattr(module, "iter_frame_rms", fake_iter_frame_rms)
+
+
+@pytest.mark.parametrize("target_ms", [20, 30, 40, 100, 500])
+def test_spans_advance_for_tiny_targets(frames, target_ms):
+    spans = list(module.plan_chunk_spans("audio.wav", target_ms))
+    starts = [start for start, _ in spans]
+    assert starts[0] == 0 and starts == sorted(set(starts))
+    assert all(end is None or end > start for start, end in spans)
+    assert spans[-1][1] is None
+    assert all(end == next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+
+
+@pytest.mark.parametrize("silence_aware", [True, False])
+def test_non_positive_chunk_length_is_rejected(silence_aware):
+    with pytest.raises(ValueError):
+        list(module.iter_chunk_spans("audio.wav", 0, silence_aware))
+
+
+@pytest.mark.parametrize(
+    "chunk_length_ms, max_chunk_bytes", [(0, module.MAX_UPLOAD_BYTES), (None, 1000)]
+)
+def test_too_short_chunks_are_rejected(chunk_length_ms, max_chunk_bytes):
+    with pytest.raises(ValueError, match="at least"):
+        module.audio_to_subtitle(
+            "audio.wav", chunk_length_ms=chunk_length_ms, max_chunk_bytes=max_chunk_bytes
+        )
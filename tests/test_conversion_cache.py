@@ -0,0 +1,70 @@
+import shutil
+
+from tools.conversion_cache import ConversionCache
+
+
+def evict_after_get(cache):
+    """Make the cache's get() succeed and then lose the entry, as a concurrent evict() would."""
+    get = cache.get
+
+    def racing_get(key):
+        manifest = get(key)
+        if manifest is not None:
+            shutil.rmtree(cache._entry_dir(key))
+        return manifest
+
+    cache.get = racing_get
+
+
+def test_run_files_converts_again_when_hit_is_evicted(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    source = tmp_path / "deck.pptx"
+    source.write_bytes(b"slides")
+    out = tmp_path / "out"
+    out.mkdir()
+    calls = []
+
+    def convert():
+        calls.append(1)
+        target = out / "deck.pdf"
+        target.write_bytes(b"pdf")
+        return str(target)
+
+    cache.run_files("pptx_to_pdf", str(source), {}, convert, output_folder=str(out))
+    evict_after_get(cache)
+    result = cache.run_files("pptx_to_pdf", str(source), {}, convert, output_folder=str(out))
+    assert result == str(out / "deck.pdf")
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_run_blobs_falls_back_to_producer_when_hit_is_evicted(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    source = tmp_path / "deck.pptx"
+    source.write_bytes(b"slides")
+
+    def produce():
+        for page in (1, 2, 3):
+            yield page, f"page {page}".encode()
+
+    first = list(cache.run_blobs("pptx_png", str(source), {}, produce))
+    evict_after_get(cache)
+    assert list(cache.run_blobs("pptx_png", str(source), {}, produce)) == first
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_run_blobs_skips_pages_already_streamed(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    source = tmp_path / "deck.pptx"
+    source.write_bytes(b"slides")
+
+    def produce():
+        for page in (1, 2, 3):
+            yield page, f"page {page}".encode()
+
+    first = list(cache.run_blobs("pptx_png", str(source), {}, produce))
+    blobs = cache.run_blobs("pptx_png", str(source), {}, produce)
+    streamed = [next(blobs)]
+    shutil.rmtree(cache._entry_dir(cache.make_key("pptx_png", str(source), {})))
+    streamed.extend(blobs)
+    assert streamed == first
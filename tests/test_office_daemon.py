@@ -0,0 +1,173 @@
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from tools import office_daemon
+
+FAKE_UNO = '''
+import socket
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import unquote, urlparse
+
+
+def systemPathToFileUrl(path):
+    return Path(path).as_uri()
+
+
+def createUnoStruct(name):
+    return SimpleNamespace()
+
+
+class Document:
+    def __init__(self, path):
+        self.path = path
+
+    def supportsService(self, service):
+        return service == "com.sun.star.presentation.PresentationDocument"
+
+    def storeToURL(self, url, properties):
+        with open(unquote(urlparse(url).path), "w") as f:
+            f.write("PDF of " + self.path)
+
+    def close(self, deliver):
+        pass
+
+
+class Desktop:
+    def __init__(self, port):
+        self.port = port
+
+    def _check(self):
+        socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+
+    def loadComponentFromURL(self, url, frame, flags, properties):
+        self._check()
+        path = unquote(urlparse(url).path)
+        if path.endswith("hang.pptx"):
+            time.sleep(3600)
+        return Document(path) if path.endswith(".pptx") else None
+
+    def getComponents(self):
+        self._check()
+
+    def terminate(self):
+        with socket.create_connection(("127.0.0.1", self.port), timeout=1) as connection:
+            connection.sendall(b"quit")
+
+
+class ServiceManager:
+    def createInstanceWithContext(self, name, context):
+        if name == "com.sun.star.bridge.UnoUrlResolver":
+            return self
+        return Desktop(context.port)
+
+    def resolve(self, url):
+        port = int(url.split("port=")[1].split(";")[0])
+        socket.create_connection(("127.0.0.1", port), timeout=1).close()
+        return SimpleNamespace(ServiceManager=self, port=port)
+
+
+def getComponentContext():
+    return SimpleNamespace(ServiceManager=ServiceManager())
+'''
+
+FAKE_SOFFICE = '''
+import socket
+import sys
+
+accept = next(arg for arg in sys.argv if arg.startswith("--accept="))
+port = int(accept.split("port=")[1].split(";")[0])
+server = socket.socket()
+server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+server.bind(("127.0.0.1", port))
+server.listen()
+while True:
+    connection = server.accept()[0]
+    with connection:
+        connection.settimeout(0.1)
+        try:
+            if connection.recv(4) == b"quit":
+                break
+        except socket.timeout:
+            pass
+'''
+
+
+def _executable(path, body):
+    path.write_text(body)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+@pytest.fixture
+def fake_office(tmp_path, monkeypatch):
+    """A UNO_PYTHON that imports a fake uno module, and a fake soffice binary."""
+    uno_dir = tmp_path / "uno"
+    uno_dir.mkdir()
+    (uno_dir / "uno.py").write_text(FAKE_UNO)
+    python = _executable(
+        tmp_path / "uno_python",
+        f'#!/bin/sh\nPYTHONPATH="{uno_dir}" exec "{sys.executable}" "$@"\n',
+    )
+    soffice = _executable(
+        tmp_path / "soffice", f"#!{sys.executable}\n" + textwrap.dedent(FAKE_SOFFICE)
+    )
+    monkeypatch.setenv("UNO_PYTHON", python)
+    office_daemon.uno_python.cache_clear()
+    yield soffice
+    office_daemon.uno_python.cache_clear()
+
+
+def test_uno_python_none_without_bridge(monkeypatch):
+    monkeypatch.setenv("UNO_PYTHON", sys.executable)
+    office_daemon.uno_python.cache_clear()
+    try:
+        if office_daemon.uno_python() is not None:
+            pytest.skip("this interpreter has the real UNO bridge")
+        assert not office_daemon.uno_available()
+    finally:
+        office_daemon.uno_python.cache_clear()
+
+
+def test_pool_converts_through_bridge_helper(fake_office, tmp_path):
+    assert office_daemon.uno_python() == os.environ["UNO_PYTHON"]
+    source = tmp_path / "deck.pptx"
+    source.write_text("slides")
+
+    pool = office_daemon.OfficePool(size=1, binary=fake_office)
+    try:
+        pool.convert_to_pdf(str(source), str(tmp_path / "deck.pdf"))
+        assert (tmp_path / "deck.pdf").read_text() == f"PDF of {source}"
+
+        with pytest.raises(RuntimeError, match="could not open"):
+            pool.convert_to_pdf(str(tmp_path / "notes.txt"), str(tmp_path / "notes.pdf"))
+
+        # A crashed daemon is restarted and the conversion retried
+        instance = pool._instances[0]
+        instance.process.kill()
+        instance.process.wait()
+        pool.convert_to_pdf(str(source), str(tmp_path / "again.pdf"))
+        assert (tmp_path / "again.pdf").exists()
+    finally:
+        pool.close()
+    assert instance.process is None and instance.bridge is None
+
+
+def test_hung_conversion_times_out_and_restarts(fake_office, tmp_path):
+    source = tmp_path / "deck.pptx"
+    source.write_text("slides")
+    (tmp_path / "hang.pptx").write_text("slides")
+
+    pool = office_daemon.OfficePool(size=1, binary=fake_office, convert_timeout=1)
+    try:
+        with pytest.raises(TimeoutError):
+            pool.convert_to_pdf(str(tmp_path / "hang.pptx"), str(tmp_path / "hang.pdf"))
+        pool.convert_to_pdf(str(source), str(tmp_path / "deck.pdf"))
+        assert (tmp_path / "deck.pdf").exists()
+    finally:
+        pool.close()
@@ -0,0 +1,71 @@
+import importlib
+import os
+
+import pytest
+
+# tools re-exports the pptx_to_pdf function under the module's name
+module = importlib.import_module("tools.pptx_to_pdf")
+
+
+@pytest.fixture
+def linux(monkeypatch):
+    monkeypatch.setattr(module.platform, "system", lambda: "Linux")
+
+
+def fake_convert(pptx_paths, output_dir):
+    outcomes = []
+    for path in pptx_paths:
+        pdf_path = os.path.join(output_dir, os.path.basename(path)[:-5] + ".pdf")
+        with open(pdf_path, "w") as f:
+            f.write(path)
+        outcomes.append((pdf_path, None))
+    return outcomes
+
+
+def test_numbered_duplicates_do_not_collide_with_other_inputs(tmp_path, linux, monkeypatch):
+    monkeypatch.setattr(module, "_convert_group_with_libreoffice", fake_convert)
+    inputs = [
+        str(tmp_path / "a" / "deck.pptx"),
+        str(tmp_path / "b" / "deck.pptx"),
+        str(tmp_path / "deck_2.pptx"),
+    ]
+    results = module.pptx_to_pdf_batch(inputs, str(tmp_path / "out"))
+    outputs = [result["output"] for result in results]
+    assert len(set(outputs)) == 3
+    for path, output in zip(inputs, outputs):
+        with open(output) as f:
+            assert f.read() == path
+
+
+def test_missing_libreoffice_fails_each_input(tmp_path, linux, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    inputs = [str(tmp_path / "one.pptx"), str(tmp_path / "two.pptx")]
+    results = module.pptx_to_pdf_batch(inputs, str(tmp_path / "out"))
+    assert [result["output"] for result in results] == [None, None]
+    assert all("LibreOffice conversion failed" in result["error"] for result in results)
+
+
+def test_duplicates_are_numbered_off_linux(tmp_path, monkeypatch):
+    def fake_pptx_to_pdf(pptx_path, output_folder):
+        pdf_path = os.path.join(output_folder, os.path.basename(pptx_path)[:-5] + ".pdf")
+        with open(pdf_path, "w") as f:
+            f.write(pptx_path)
+        return pdf_path
+
+    monkeypatch.setattr(module.platform, "system", lambda: "Windows")
+    monkeypatch.setattr(module, "pptx_to_pdf", fake_pptx_to_pdf)
+    inputs = [
+        str(tmp_path / "a" / "deck.pptx"),
+        str(tmp_path / "b" / "deck.pptx"),
+        str(tmp_path / "deck_2.pptx"),
+    ]
+    results = module.pptx_to_pdf_batch(inputs, str(tmp_path / "out"))
+    outputs = [result["output"] for result in results]
+    assert [os.path.basename(output) for output in outputs] == [
+        "deck.pdf",
+        "deck_3.pdf",
+        "deck_2.pdf",
+    ]
+    for path, output in zip(inputs, outputs):
+        with open(output) as f:
+            assert f.read() == path
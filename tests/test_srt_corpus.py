@@ -0,0 +1,96 @@
+import asyncio
+import os
+
+from tools import srt_processor
+from tools.srt_processor import process_srt_corpus
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\nHello there.\n"
+
+
+def write_corpus(root):
+    os.makedirs(os.path.join(root, "season"), exist_ok=True)
+    for name in ("a.srt", os.path.join("season", "b.srt")):
+        with open(os.path.join(root, name), "w", encoding="utf-8") as f:
+            f.write(SRT)
+
+
+def test_outputs_inside_the_source_are_not_reprocessed(tmp_path):
+    source = str(tmp_path / "corpus")
+    write_corpus(source)
+    output_dir = os.path.join(source, "out")
+    for _ in range(3):
+        summary = process_srt_corpus(source, output_dir)
+    assert len(summary.processed) == 0
+    assert len(summary.skipped) == 2
+    assert not os.path.exists(os.path.join(output_dir, "out"))
+
+
+def test_glob_mode_excludes_the_output_directory(tmp_path):
+    source = str(tmp_path / "corpus")
+    write_corpus(source)
+    output_dir = os.path.join(source, "season", "out")
+    process_srt_corpus(os.path.join(source, "**", "*.srt"), output_dir)
+    summary = process_srt_corpus(os.path.join(source, "**", "*.srt"), output_dir)
+    assert sorted(os.path.relpath(p, output_dir) for p in summary.skipped) == [
+        "a.srt",
+        os.path.join("season", "b.srt"),
+    ]
+
+
+class FakeEngine:
+    """Stands in for TranslationEngine in corpus runs."""
+
+    input_tokens = 0
+    output_tokens = 0
+    cached_tokens = 0
+
+    def __init__(self, router, model, system_prompt, max_concurrency=15):
+        self.router = router
+        self.model = model
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def complete(self, prompt, max_tokens=1024, estimated_tokens=0):
+        await asyncio.sleep(0.01)
+        return "translated"
+
+    def stats(self):
+        return {"requests": 0}
+
+
+def test_corpus_bounds_files_translated_at_once(tmp_path, monkeypatch):
+    source = tmp_path / "corpus"
+    source.mkdir()
+    for i in range(10):
+        (source / f"{i}.srt").write_text(SRT.replace("Hello", f"Hello {i}"), encoding="utf-8")
+
+    running = []
+    peak = []
+    translate_blocks = srt_processor.translate_blocks
+
+    async def counting_translate_blocks(*args, **kwargs):
+        running.append(1)
+        peak.append(len(running))
+        try:
+            return await translate_blocks(*args, **kwargs)
+        finally:
+            running.pop()
+
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "test")
+    monkeypatch.setattr(srt_processor, "TranslationEngine", FakeEngine)
+    monkeypatch.setattr(srt_processor, "translate_blocks", counting_translate_blocks)
+    monkeypatch.setattr(srt_processor, "CORPUS_MAX_OPEN_FILES", 3)
+    summary = process_srt_corpus(
+        str(source),
+        str(tmp_path / "out"),
+        operation="translate",
+        target_lang="fr",
+        use_memory=False,
+    )
+    assert len(summary.processed) == 10 and not summary.failed
+    assert max(peak) == 3
+    assert (tmp_path / "out" / "7.srt").read_text(encoding="utf-8").endswith("translated")
@@ -0,0 +1,15 @@
+from tools.srt_processor import parse_srt_blocks
+
+
+def test_short_fractions_are_fractions_of_a_second():
+    issues = []
+    cues = parse_srt_blocks("1\n00:00:01,5 --> 00:00:02.25\nHello\n", issues)
+    assert (cues[0].start_ms, cues[0].end_ms) == (1500, 2250)
+    assert [issue.line for issue in issues] == [2]
+
+
+def test_canonical_timestamps_report_no_issues():
+    issues = []
+    cues = parse_srt_blocks("1\n00:00:01,005 --> 00:00:02,250\nHello\n", issues)
+    assert (cues[0].start_ms, cues[0].end_ms) == (1005, 2250)
+    assert issues == []
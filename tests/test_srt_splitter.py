@@ -0,0 +1,58 @@
+import random
+import re
+
+import pytest
+
+from tools.srt_processor import split_text_into_chunks_by_chars_with_punctuation
+
+
+def reference_split(text, max_chars):
+    """The original suffix-slicing splitter, kept as the oracle for the linear one."""
+    text = re.sub(r"\s+", " ", text).strip()
+    chunks = []
+    i = 0
+    n = len(text)
+    while i < n:
+        remaining = text[i:]
+        if len(remaining) <= max_chars:
+            chunks.append(remaining.strip())
+            break
+        window = remaining[:max_chars]
+        cut_at = max(window.rfind("."), window.rfind(","))
+        if cut_at != -1:
+            end = cut_at + 1
+        else:
+            last_space = window.rfind(" ")
+            end = last_space if last_space != -1 else max_chars
+        chunk = remaining[:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        i += end
+        while i < n and text[i] == " ":
+            i += 1
+    return [c for c in chunks if c]
+
+
+# Pieces the original splitter and the current one treat alike: words, Latin '.' and
+# ',' and Unicode whitespace (the other sentence punctuation was added later)
+PIECES = ["a", "b", "é", "word", "long" * 5, " ", "  ", ".", ",", "\n", "\t", "　", "\xa0"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_reference_splitter(seed):
+    rng = random.Random(seed)
+    for _ in range(2000):
+        text = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 120)))
+        max_chars = rng.randint(1, 40)
+        assert split_text_into_chunks_by_chars_with_punctuation(
+            text, max_chars
+        ) == reference_split(text, max_chars), (text, max_chars)
+
+
+def test_long_single_cue():
+    rng = random.Random(0)
+    words = ["subtitle", "text", "goes", "here,", "and", "there.", "x" * 30]
+    text = " ".join(rng.choice(words) for _ in range(40000))
+    assert split_text_into_chunks_by_chars_with_punctuation(
+        text, 125
+    ) == reference_split(text, 125)
@@ -0,0 +1,72 @@
+import asyncio
+
+from tools.srt_processor import (
+    CONTEXT_PROMPT,
+    Cue,
+    estimate_tokens,
+    translate_batch,
+    translate_blocks,
+)
+
+
+class FakeEngine:
+    """Stands in for TranslationEngine; batched prompts get a reply without markers."""
+
+    router = "fake"
+    model = "fake"
+    input_tokens = 0
+    output_tokens = 0
+    cached_tokens = 0
+
+    def __init__(self):
+        self.prompts = []
+        self.estimates = []
+
+    async def complete(self, prompt, max_tokens=1024, estimated_tokens=0):
+        self.prompts.append(prompt)
+        self.estimates.append(estimated_tokens)
+        if "[[1]]" in prompt:
+            return "misaligned reply"
+        return "T:" + prompt.rsplit("\n\n", 1)[1]
+
+
+def test_translate_batch_falls_back_to_one_request_per_text():
+    engine = FakeEngine()
+    result = asyncio.run(translate_batch(engine, ["one", "two"], "fr"))
+    assert result == ["T:one", "T:two"]
+    assert len(engine.prompts) == 3
+
+
+def test_translate_batch_context_fallback_returns_flat_list():
+    engine = FakeEngine()
+    result = asyncio.run(
+        translate_batch(engine, ["one", "two"], "fr", context=(["before"], ["after"]))
+    )
+    assert result == ["T:one", "T:two"]
+
+
+def test_translate_blocks_survives_misaligned_batched_reply():
+    engine = FakeEngine()
+    cues = [Cue(i + 1, i * 1000, i * 1000 + 900, [f"line {i}"]) for i in range(5)]
+    translated = asyncio.run(translate_blocks(cues, engine, "fr", batch_size=3))
+    assert [cue.lines for cue in translated] == [[f"T:line {i}"] for i in range(5)]
+
+
+def test_context_requests_start_with_the_same_instructions():
+    engine = FakeEngine()
+    cues = [Cue(i + 1, i * 1000, i * 1000 + 900, [f"line {i}"]) for i in range(30)]
+    asyncio.run(translate_blocks(cues, engine, "fr", batch_size=5, context_cues=2))
+    context_prompts = [prompt for prompt in engine.prompts if "Context before:" in prompt]
+    assert len(context_prompts) == 6
+    # Only the instructions come before the per-request context, with nothing added to them
+    prefix = CONTEXT_PROMPT.format(target_lang="fr") + "\n\nContext before:\n"
+    assert all(prompt.startswith(prefix) for prompt in context_prompts)
+
+
+def test_every_request_estimates_its_whole_prompt():
+    engine = FakeEngine()
+    cues = [Cue(i + 1, i * 1000, i * 1000 + 900, [f"line {i}"]) for i in range(6)]
+    asyncio.run(translate_blocks(cues, engine, "fr", batch_size=3, context_cues=1))
+    # Context, batch and single-text requests all ran
+    assert len(engine.prompts) == 2 + 2 + 6
+    assert engine.estimates == [estimate_tokens(prompt) for prompt in engine.prompts]
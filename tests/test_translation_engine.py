@@ -0,0 +1,41 @@
+import asyncio
+from types import SimpleNamespace
+
+from openai import RateLimitError
+
+from tools import translation_engine
+from tools.translation_engine import ProviderRateLimiter, TranslationEngine
+
+
+class FakeClient:
+    async def close(self):
+        pass
+
+
+def test_retried_attempts_are_not_counted_as_requests(monkeypatch):
+    failures = {"left": 2}
+
+    async def create_completion(client, router, model, system, prompt, max_tokens):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise RateLimitError.__new__(RateLimitError)
+        message = SimpleNamespace(content="translated")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    monkeypatch.setattr(translation_engine, "create_async_client", lambda *a, **k: FakeClient())
+    monkeypatch.setattr(translation_engine, "create_completion", create_completion)
+    monkeypatch.setattr(translation_engine, "retry_delay", lambda error, attempt: 0)
+
+    async def run():
+        engine = TranslationEngine(
+            "openai", "model", "system", rate_limiter=ProviderRateLimiter(1000.0)
+        )
+        async with engine:
+            replies = await asyncio.gather(*(engine.complete("text") for _ in range(3)))
+        return replies, engine.stats()
+
+    replies, stats = asyncio.run(run())
+    assert replies == ["translated"] * 3
+    assert stats["requests"] == 3
+    assert stats["retries"] == 2
+    assert stats["throttled"] == 2
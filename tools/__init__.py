@@ -1,7 +1,39 @@
-from .pdf_to_png import pdf_to_png
-from .pptx_to_pdf import pptx_to_pdf
-from .pptx_to_png import pptx_to_png
+from .pdf_to_png import pdf_to_png, iter_pdf_to_png, iter_pdf_to_png_bytes
+from .pptx_to_pdf import pptx_to_pdf, pptx_to_pdf_batch
+from .pptx_to_png import pptx_to_png, iter_pptx_to_png_bytes
 from .m4a_to_mp3 import m4a_to_mp3
 from .mp4_to_mp3 import mp4_to_mp3
 from .audio_to_subtitle import audio_to_subtitle
-from .srt_processor import translate_srt, resegment_srt, process_srt_file
+from .transcription_backends import (
+    TranscriptionBackend,
+    OpenAIWhisperBackend,
+    FasterWhisperBackend,
+    FakeTranscriptionBackend,
+    get_transcription_backend,
+)
+from .llm_clients import get_client
+from .translation_engine import TranslationEngine
+from .translation_memory import TranslationMemory, get_translation_memory
+from .srt_processor import (
+    translate_srt,
+    resegment_srt,
+    process_srt_file,
+    process_srt_content,
+    process_srt_corpus,
+    CorpusSummary,
+    SegmentLimits,
+    Cue,
+    ParseIssue,
+    TranslationProgress,
+)
+from .conversion_cache import (
+    ConversionCache,
+    get_conversion_cache,
+    cached_pdf_to_png,
+    cached_pptx_to_pdf,
+    cached_pptx_to_png,
+    cached_iter_pptx_to_png_bytes,
+    cached_m4a_to_mp3,
+    cached_mp4_to_mp3,
+    cached_audio_to_subtitle,
+)
@@ -1,91 +1,418 @@
-from openai import OpenAI
-from pydub import AudioSegment
 from pathlib import Path
+import concurrent.futures
+import numpy as np
 import srt
 import datetime
 import os
+import subprocess
 import tempfile
+from .transcription_backends import OpenAIWhisperBackend
+from .transcription_checkpoints import get_checkpoint_store, make_job_key
 
-def audio_to_subtitle(file_path, chunk_length_ms=10*60*1000, api_key=None):
+# Silence analysis runs on a cheap 8 kHz mono decode, in 20 ms frames
+ANALYSIS_SAMPLE_RATE = 8000
+ANALYSIS_FRAME_MS = 20
+
+# Shortest chunk accepted; anything shorter means a misconfigured length or upload budget
+MIN_CHUNK_LENGTH_MS = 5 * 1000
+
+# Whisper API upload limit, and the share of it a chunk may use (container overhead, VBR peaks)
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+UPLOAD_BUDGET_RATIO = 0.9
+
+# Chunk encodings: Whisper works at 16 kHz mono, so anything richer only costs upload bytes
+ENCODING_PROFILES = {
+    "speech_opus": {
+        "extension": "ogg",
+        "bitrate_kbps": 24,
+        "args": ["-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "ogg"],
+    },
+    "speech_mp3": {
+        "extension": "mp3",
+        "bitrate_kbps": 32,
+        "args": ["-ac", "1", "-ar", "16000", "-c:a", "libmp3lame", "-b:a", "32k", "-f", "mp3"],
+    },
+}
+
+def probe_duration_ms(file_path):
+    """Return the duration of an audio/video file in milliseconds, read with ffprobe."""
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        file_path,
+    ]
+    result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return int(float(result.stdout.decode().strip()) * 1000)
+
+
+def cut_audio_chunk(file_path, start_ms, duration_ms, output_path, profile="speech_opus"):
+    """Encode ``duration_ms`` of audio (to the end if None) starting at ``start_ms`` with an ENCODING_PROFILES entry."""
+    command = [
+        "ffmpeg",
+        "-y",
+        "-ss", f"{start_ms / 1000:.3f}",  # Input seeking: nothing before the chunk is decoded
+    ]
+    if duration_ms is not None:
+        command += ["-t", f"{duration_ms / 1000:.3f}"]
+    command += [
+        "-i", file_path,
+        "-vn",
+        *ENCODING_PROFILES[profile]["args"],
+        str(output_path),
+    ]
+    try:
+        subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as e:
+        print("Error during chunking:", e.stderr.decode())
+        raise
+    return output_path
+
+
+def budgeted_chunk_length_ms(chunk_length_ms, profile="speech_opus", max_bytes=MAX_UPLOAD_BYTES, overlap_ms=0):
+    """
+    Longest chunk span whose encoding, overlap included, stays within the upload byte budget.
+
+    Args:
+        chunk_length_ms (int): Requested chunk length in milliseconds, or None to size by bytes alone
+        profile (str): ENCODING_PROFILES entry used for the chunks
+        max_bytes (int): Upload size limit per request
+        overlap_ms (int): Extra audio added on each side of a span
+
+    Returns:
+        int: Chunk span length in milliseconds
+    """
+    bytes_per_ms = ENCODING_PROFILES[profile]["bitrate_kbps"] / 8
+    budget_ms = int(max_bytes * UPLOAD_BUDGET_RATIO / bytes_per_ms) - 2 * overlap_ms
+    if chunk_length_ms is None:
+        return budget_ms
+    return min(chunk_length_ms, budget_ms)
+
+
+def iter_frame_rms(file_path, frame_ms=ANALYSIS_FRAME_MS, block_frames=1500):
+    """
+    Yield per-frame RMS energy of a downsampled mono decode, one numpy array per block.
+
+    ffmpeg streams 16-bit PCM over a pipe and only ``block_frames`` frames are held at a time;
+    a trailing partial frame is zero-padded.
+    """
+    frame_samples = ANALYSIS_SAMPLE_RATE * frame_ms // 1000
+    frame_bytes = frame_samples * 2
+    command = [
+        "ffmpeg",
+        "-v", "error",
+        "-i", file_path,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(ANALYSIS_SAMPLE_RATE),
+        "-f", "s16le",
+        "-",
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    remainder = b""
+    try:
+        while True:
+            data = process.stdout.read(frame_bytes * block_frames)
+            if not data:
+                break
+            data = remainder + data
+            usable = len(data) - len(data) % frame_bytes
+            remainder = data[usable:]
+            if usable:
+                samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32)
+                frames = samples.reshape(-1, frame_samples)
+                yield np.sqrt(np.mean(frames * frames, axis=1))
+        if remainder:
+            samples = np.frombuffer(remainder[: len(remainder) // 2 * 2], dtype="<i2")
+            padded = np.zeros(frame_samples, dtype=np.float32)
+            padded[: len(samples)] = samples
+            yield np.sqrt(np.mean(padded * padded, keepdims=True))
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {file_path} for silence analysis")
+
+
+def plan_chunk_spans(file_path, target_ms, search_ms=None, min_silence_ms=300):
+    """
+    Plan chunk boundaries in the quietest stretch shortly before each target length.
+
+    For every boundary, the RMS energy of the last ``search_ms`` before the target is smoothed
+    over ``min_silence_ms`` and the cut goes to its minimum, so cuts land between words rather
+    than inside them. Spans are yielded as soon as the audio past each target has been analysed.
+
+    Args:
+        file_path (str): Path to the audio/video file
+        target_ms (int): Desired chunk length in milliseconds
+        search_ms (int): How far before the target a cut may move (default: a quarter of the target, at most 30 s)
+        min_silence_ms (int): Length of the quiet stretch looked for (default: 300 ms)
+
+    Yields:
+        Tuple[int, Optional[int]]: Start and end of each chunk in milliseconds; the last end is None.
+    """
+    if target_ms <= 0:
+        raise ValueError(f"Chunk length must be positive, got {target_ms} ms")
+    if search_ms is None:
+        search_ms = min(30 * 1000, target_ms // 4)
+    frame_ms = ANALYSIS_FRAME_MS
+    target_frames = max(1, target_ms // frame_ms)
+    search_frames = max(1, min(search_ms // frame_ms, target_frames - 1))
+    kernel_frames = max(1, min(min_silence_ms // frame_ms, search_frames))
+    kernel = np.full(kernel_frames, 1 / kernel_frames, dtype=np.float32)
+
+    # energy[i] is frame offset + i; frames before the last cut are dropped
+    energy = np.empty(0, dtype=np.float32)
+    offset = 0
+    last_cut = 0
+    for block in iter_frame_rms(file_path, frame_ms):
+        energy = np.concatenate([energy, block])
+        while last_cut + target_frames < offset + len(energy):
+            target = last_cut + target_frames
+            low = target - search_frames
+            window = energy[low - offset : target - offset]
+            # smoothed[i] is the mean energy of window[i : i + kernel_frames]
+            smoothed = np.convolve(window, kernel, mode="valid")
+            # Cut in the middle of the quietest stretch, not at its leading edge
+            quietest = int(np.argmin(smoothed))
+            quiet_end = quietest
+            while quiet_end + 1 < len(smoothed) and smoothed[quiet_end + 1] <= smoothed[quietest]:
+                quiet_end += 1
+            cut = low + (quietest + quiet_end) // 2 + kernel_frames // 2
+            # Always advance, even when the search window reaches back to the last cut
+            cut = max(cut, last_cut + 1)
+            yield last_cut * frame_ms, cut * frame_ms
+            energy = energy[cut - offset :]
+            offset = last_cut = cut
+    if offset + len(energy) > last_cut:
+        yield last_cut * frame_ms, None
+
+
+def iter_chunk_spans(file_path, chunk_length_ms, silence_aware=True):
+    """
+    Plan the spans of audio each chunk owns, cut in silence or at fixed offsets.
+
+    Yields:
+        Tuple[int, Optional[int]]: Start and end of each span in milliseconds; the last end is None.
+    """
+    if chunk_length_ms <= 0:
+        raise ValueError(f"Chunk length must be positive, got {chunk_length_ms} ms")
+    if silence_aware:
+        yield from plan_chunk_spans(file_path, chunk_length_ms)
+        return
+    total_ms = probe_duration_ms(file_path)
+    for start_ms in range(0, total_ms, chunk_length_ms):
+        end_ms = start_ms + chunk_length_ms
+        yield start_ms, end_ms if end_ms < total_ms else None
+
+
+def cut_span(file_path, span_start_ms, span_end_ms, output_path, overlap_ms=1000, profile="speech_opus"):
+    """Encode a span widened by ``overlap_ms`` on both sides; returns the chunk's start offset in milliseconds."""
+    start_ms = max(0, span_start_ms - overlap_ms)
+    duration_ms = None if span_end_ms is None else span_end_ms + overlap_ms - start_ms
+    cut_audio_chunk(file_path, start_ms, duration_ms, output_path, profile=profile)
+    return start_ms
+
+
+def compose_srt(segments):
+    """Compose SRT content from ``{"start_ms", "end_ms", "text"}`` segments in time order."""
+    return srt.compose(
+        [
+            srt.Subtitle(
+                index=i + 1,
+                start=datetime.timedelta(milliseconds=seg["start_ms"]),
+                end=datetime.timedelta(milliseconds=seg["end_ms"]),
+                content=seg["text"],
+            )
+            for i, seg in enumerate(segments)
+        ]
+    )
+
+
+def audio_to_subtitle(
+    file_path,
+    chunk_length_ms=10*60*1000,
+    api_key=None,
+    workers=4,
+    max_retries=5,
+    silence_aware=True,
+    overlap_ms=1000,
+    encoding_profile="speech_opus",
+    max_chunk_bytes=MAX_UPLOAD_BYTES,
+    checkpoint_store=None,
+    progress_callback=None,
+    backend=None,
+):
     """
-    Convert audio/video file to SRT subtitle format using OpenAI Whisper API.
-    
+    Convert audio/video file to SRT subtitle format using OpenAI Whisper API or another transcription backend.
+
     Args:
         file_path (str): Path to the audio/video file
-        chunk_length_ms (int): Length of audio chunks in milliseconds (default: 10 minutes)
-        api_key (str): OpenAI API key (optional, will use environment variable if not provided)
-    
+        chunk_length_ms (int): Length of audio chunks in milliseconds, or None to size chunks
+            by ``max_chunk_bytes`` alone (default: 10 minutes, capped by the byte budget);
+            ValueError is raised if that leaves less than MIN_CHUNK_LENGTH_MS
+        api_key (str): OpenAI API key for the default backend (optional, will use environment variable if not provided)
+        workers (int): Number of chunks transcribed concurrently (default: 4)
+        max_retries (int): Retries per chunk on rate limits and transient API errors for the default backend (default: 5)
+        silence_aware (bool): Move chunk cuts into nearby silence instead of fixed offsets (default: True)
+        overlap_ms (int): Audio shared by neighbouring chunks around each cut (default: 1 second)
+        encoding_profile (str): ENCODING_PROFILES entry used for uploads (default: 16 kHz mono Opus)
+        max_chunk_bytes (int): Upload size limit per chunk (default: the 25 MB API limit)
+        checkpoint_store (TranscriptionCheckpointStore): Where finished chunks are saved so a
+            failed or interrupted job resumes with only the missing chunks (default: the shared store)
+        progress_callback (Callable[[int, int, str], None]): Called from the calling thread with the
+            number of finished chunks, the number planned so far and the partial SRT
+        backend (TranscriptionBackend): Transcribes each chunk (default: OpenAIWhisperBackend)
+
     Returns:
         str: SRT formatted subtitle content
     """
-    # Initialize OpenAI client
-    client_kwargs = {}
-    if api_key:
-        client_kwargs['api_key'] = api_key
-    client = OpenAI(**client_kwargs)
-    
-    def split_audio(file_path, chunk_length_ms):
-        """Split audio into chunks for processing."""
-        audio = AudioSegment.from_file(file_path)
-        chunks = []
-        
-        # Create temporary directory for chunks
-        temp_dir = tempfile.mkdtemp()
-        
-        for i, start_ms in enumerate(range(0, len(audio), chunk_length_ms)):
-            chunk = audio[start_ms:start_ms+chunk_length_ms]
-            chunk_path = Path(temp_dir) / f"chunk_{i}.mp3"
-            chunk.export(chunk_path, format="mp3")
-            chunks.append((chunk_path, start_ms))
-        return chunks, temp_dir
-
-    def transcribe_chunk(file_path, offset_ms):
-        """Transcribe a single audio chunk."""
-        with open(file_path, "rb") as f:
-            result = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
-                response_format="verbose_json"  # needed for timestamps
-            )
+    requested_ms = chunk_length_ms
+    chunk_length_ms = budgeted_chunk_length_ms(
+        chunk_length_ms, encoding_profile, max_chunk_bytes, overlap_ms
+    )
+    if chunk_length_ms < MIN_CHUNK_LENGTH_MS:
+        raise ValueError(
+            f"Chunks must be at least {MIN_CHUNK_LENGTH_MS} ms long, got {chunk_length_ms} ms "
+            f"(requested: {requested_ms} ms, upload budget: {max_chunk_bytes} bytes, "
+            f"overlap: {overlap_ms} ms)"
+        )
+
+    if backend is None:
+        backend = OpenAIWhisperBackend(api_key=api_key, max_retries=max_retries)
+    store = checkpoint_store or get_checkpoint_store()
+    job_key = make_job_key(
+        file_path,
+        {
+            "model": backend.cache_key,
+            "chunk_length_ms": chunk_length_ms,
+            "silence_aware": silence_aware,
+            "overlap_ms": overlap_ms,
+            "encoding_profile": encoding_profile,
+        },
+    )
+
+    def transcribe_chunk(file_path, offset_ms, span_start_ms, span_end_ms):
+        """Transcribe a single audio chunk, keeping only the segments centred inside its span."""
+        chunk_segments = backend.transcribe(file_path)
+        os.remove(file_path)  # clean up chunk file
 
-        subs = []
-        if "segments" in result and result["segments"]:
-            for seg in result["segments"]:
-                start = datetime.timedelta(milliseconds=offset_ms) + datetime.timedelta(seconds=seg["start"])
-                end = datetime.timedelta(milliseconds=offset_ms) + datetime.timedelta(seconds=seg["end"])
-                subs.append(srt.Subtitle(
-                    index=len(subs)+1, 
-                    start=start, 
-                    end=end, 
-                    content=seg["text"].strip()
-                ))
-        return subs
+        segments = []
+        for seg in chunk_segments:
+            start_ms = offset_ms + int(seg["start"] * 1000)
+            end_ms = offset_ms + int(seg["end"] * 1000)
+            # Overlapping chunks both hear a seam; the chunk owning the midpoint keeps it
+            middle_ms = (start_ms + end_ms) // 2
+            if middle_ms < span_start_ms or (span_end_ms is not None and middle_ms >= span_end_ms):
+                continue
+            segments.append({"start_ms": start_ms, "end_ms": end_ms, "text": seg["text"]})
+        store.save(job_key, span_start_ms, span_end_ms, segments)
+        return segments
+
+    def report(finished, planned):
+        if progress_callback is not None:
+            progress_callback(finished, planned, compose_srt(store.completed_segments(job_key)))
 
     def transcribe_long_audio(file_path):
-        """Transcribe long audio by splitting into chunks."""
-        all_subs = []
-        chunks, temp_dir = split_audio(file_path, chunk_length_ms)
-        
-        try:
-            for chunk_path, offset_ms in chunks:
-                subs = transcribe_chunk(chunk_path, offset_ms)
-                all_subs.extend(subs)
-                chunk_path.unlink()  # clean up chunk file
-        finally:
-            # Clean up temporary directory
-            try:
-                os.rmdir(temp_dir)
-            except:
-                pass  # Directory might not be empty or already removed
-        
-        # Re-index subtitles
-        for i, sub in enumerate(all_subs):
-            sub.index = i + 1
-            
-        return all_subs
+        """Transcribe long audio chunk by chunk, transcribing earlier chunks while later ones are cut."""
+        chunk_results = []
+        pending = set()
+        finished = 0
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                spans = iter_chunk_spans(file_path, chunk_length_ms, silence_aware)
+                for i, (span_start_ms, span_end_ms) in enumerate(spans):
+                    # Chunks saved by an earlier, interrupted run are not sent again
+                    segments = store.load(job_key, span_start_ms, span_end_ms)
+                    if segments is not None:
+                        chunk_results.append(segments)
+                        finished += 1
+                        continue
+                    chunk_path = Path(temp_dir) / f"chunk_{i}.{ENCODING_PROFILES[encoding_profile]['extension']}"
+                    offset_ms = cut_span(
+                        file_path, span_start_ms, span_end_ms, chunk_path, overlap_ms, encoding_profile
+                    )
+                    future = executor.submit(
+                        transcribe_chunk, chunk_path, offset_ms, span_start_ms, span_end_ms
+                    )
+                    chunk_results.append(future)
+                    pending.add(future)
+
+                    done = {f for f in pending if f.done()}
+                    pending -= done
+                    finished += sum(1 for f in done if f.exception() is None)
+                    if done:
+                        report(finished, len(chunk_results))
+
+                for future in concurrent.futures.as_completed(pending):
+                    if future.exception() is None:
+                        finished += 1
+                        report(finished, len(chunk_results))
+
+        # Reassemble in offset order; a failed chunk raises only after every other chunk is saved
+        all_segments = []
+        for result in chunk_results:
+            if isinstance(result, concurrent.futures.Future):
+                result = result.result()
+            all_segments.extend(result)
+        return all_segments
 
     # Convert audio to subtitles
-    subs = transcribe_long_audio(file_path)
-    
+    segments = transcribe_long_audio(file_path)
+    store.clear(job_key)
+
     # Return SRT formatted content
-    return srt.compose(subs)
\ No newline at end of file
+    return compose_srt(segments)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from .transcription_backends import get_transcription_backend
+
+    parser = argparse.ArgumentParser(
+        description="Transcribe a media file to SRT and report throughput. "
+        "Run as 'python -m tools.audio_to_subtitle'; --backend fake needs no network."
+    )
+    parser.add_argument("input", help="Input audio/video file path")
+    parser.add_argument("output", help="Output SRT file path")
+    parser.add_argument(
+        "--backend",
+        choices=["openai", "local", "fake"],
+        default="openai",
+        help="Transcription backend (default: openai)",
+    )
+    parser.add_argument(
+        "--chunk-minutes", dest="chunk_minutes", type=float, default=10, help="Chunk length in minutes (default: 10)"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent chunks (default: 4)")
+    parser.add_argument(
+        "--fake-latency", dest="fake_latency", type=float, default=0.5, help="Seconds per fake request (default: 0.5)"
+    )
+    args = parser.parse_args()
+
+    backend_kwargs = {"latency_s": args.fake_latency} if args.backend == "fake" else {}
+    if args.backend == "local":
+        backend_kwargs = {"num_workers": args.workers}
+    started = time.perf_counter()
+    content = audio_to_subtitle(
+        args.input,
+        chunk_length_ms=int(args.chunk_minutes * 60 * 1000),
+        workers=args.workers,
+        backend=get_transcription_backend(args.backend, **backend_kwargs),
+    )
+    elapsed = time.perf_counter() - started
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(content)
+    audio_minutes = probe_duration_ms(args.input) / 60000
+    print(
+        f"Transcribed {audio_minutes:.1f} min of audio in {elapsed:.1f}s "
+        f"({audio_minutes * 60 / elapsed:.1f}x real time). Output written to {args.output}"
+    )
@@ -0,0 +1,397 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from .hashing import file_sha256
+from .pdf_to_png import pdf_to_png
+from .pptx_to_pdf import pptx_to_pdf
+from .pptx_to_png import pptx_to_png, iter_pptx_to_png_bytes
+from .m4a_to_mp3 import m4a_to_mp3
+from .mp4_to_mp3 import mp4_to_mp3
+from .audio_to_subtitle import audio_to_subtitle
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _stem(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+class ConversionCache:
+    """
+    Disk-backed conversion cache keyed on the SHA-256 of the input bytes plus the converter parameters.
+
+    Each entry is a directory holding the output files (or text) of one conversion and a manifest.
+    Entries are evicted least-recently-used first once the cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir, max_bytes=1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, kind, input_path, params):
+        """Build the cache key for converting ``input_path`` with ``kind`` and ``params``."""
+        payload = json.dumps(
+            {"kind": kind, "input": file_sha256(input_path), "params": params},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """Return the manifest of a cached entry and mark it as recently used, or None on a miss."""
+        manifest_path = os.path.join(self._entry_dir(key), MANIFEST_NAME)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            os.utime(manifest_path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return manifest
+
+    def _lost_hit(self):
+        """Recount a hit whose entry was evicted by another session before it was read."""
+        with self._lock:
+            self.hits -= 1
+            self.misses += 1
+
+    def put(self, key, files=(), text=None, stem=None, single=False):
+        """Store output ``files`` (copied in order) and/or ``text`` under ``key``."""
+        staging_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".staging_")
+        try:
+            names = []
+            size = 0
+            for i, path in enumerate(files):
+                name = os.path.basename(path)
+                shutil.copyfile(path, os.path.join(staging_dir, f"{i:05d}_{name}"))
+                names.append(name)
+                size += os.path.getsize(path)
+            if text is not None:
+                size += len(text.encode("utf-8"))
+            manifest = {
+                "files": names,
+                "text": text,
+                "stem": stem,
+                "single": single,
+                "size": size,
+            }
+            self._commit(staging_dir, key, manifest)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        self.evict()
+        return manifest
+
+    def _commit(self, staging_dir, key, manifest):
+        with open(os.path.join(staging_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        try:
+            os.rename(staging_dir, self._entry_dir(key))
+        except OSError:
+            pass  # Another session stored the same conversion first
+
+    def entry_file(self, key, manifest, position):
+        """Path of the ``position``-th stored output file of an entry."""
+        name = manifest["files"][position]
+        return os.path.join(self._entry_dir(key), f"{position:05d}_{name}")
+
+    def _entries(self):
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            if key.startswith("."):
+                continue  # Entries still being written
+            manifest_path = os.path.join(self._entry_dir(key), MANIFEST_NAME)
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    size = json.load(f)["size"]
+                entries.append((os.path.getmtime(manifest_path), key, size))
+            except (OSError, ValueError, KeyError):
+                continue
+        return entries
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits in ``max_bytes``."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, _, size in entries)
+            for _, key, size in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss counters and the current size of the cache."""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(size for _, _, size in entries),
+                "max_bytes": self.max_bytes,
+            }
+
+    def run_files(self, kind, input_path, params, convert, output_folder=None, output_path=None):
+        """
+        Return the output file(s) of ``convert()`` for this input, from the cache when possible.
+
+        On a hit the stored files are copied to ``output_path`` (single-file converters) or into
+        ``output_folder``, renamed after the current input the same way the converter names them.
+        A hit whose files were evicted in the meantime is converted again like a miss.
+
+        Args:
+            kind (str): Converter name, part of the key.
+            input_path (str): Path to the input file.
+            params (dict): Converter parameters that affect the output, part of the key.
+            convert (Callable[[], Union[str, List[str]]]): Runs the conversion on a miss.
+            output_folder (str, optional): Where to restore outputs named after the input.
+            output_path (str, optional): Where to restore the output of a single-file converter.
+
+        Returns:
+            Union[str, List[str]]: Same shape as the return value of ``convert``.
+        """
+        key = self.make_key(kind, input_path, params)
+        manifest = self.get(key)
+        if manifest is not None:
+            try:
+                return self._restore_files(key, manifest, input_path, output_folder, output_path)
+            except FileNotFoundError:
+                self._lost_hit()
+        result = convert()
+        single = isinstance(result, str)
+        self.put(
+            key,
+            [result] if single else result,
+            stem=_stem(input_path),
+            single=single,
+        )
+        return result
+
+    def _restore_files(self, key, manifest, input_path, output_folder, output_path):
+        restored = []
+        for position, name in enumerate(manifest["files"]):
+            if output_path is not None:
+                target = output_path
+            else:
+                if manifest["stem"] and name.startswith(manifest["stem"]):
+                    name = _stem(input_path) + name[len(manifest["stem"]) :]
+                target = os.path.join(output_folder, name)
+            shutil.copyfile(self.entry_file(key, manifest, position), target)
+            restored.append(target)
+        return restored[0] if manifest["single"] else restored
+
+    def run_blobs(self, kind, input_path, params, produce):
+        """
+        Yield the ``(page_number, bytes)`` pairs of ``produce()`` for this input, from the cache when possible.
+
+        On a miss each blob is written to the cache as it is yielded, so streaming is not delayed;
+        the entry is only committed once the producer has been fully consumed. A hit whose files
+        are evicted while it is read continues from ``produce()``, skipping pages already yielded.
+        """
+        key = self.make_key(kind, input_path, params)
+        manifest = self.get(key)
+        yielded = set()
+        if manifest is not None:
+            for position, page_number in enumerate(manifest["pages"]):
+                try:
+                    with open(self.entry_file(key, manifest, position), "rb") as f:
+                        data = f.read()
+                except FileNotFoundError:
+                    self._lost_hit()
+                    break
+                yield page_number, data
+                yielded.add(page_number)
+            else:
+                return
+
+        staging_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".staging_")
+        try:
+            names = []
+            pages = []
+            size = 0
+            for page_number, data in produce():
+                name = f"{page_number}.bin"
+                with open(os.path.join(staging_dir, f"{len(names):05d}_{name}"), "wb") as f:
+                    f.write(data)
+                names.append(name)
+                pages.append(page_number)
+                size += len(data)
+                if page_number not in yielded:
+                    yield page_number, data
+            manifest = {
+                "files": names,
+                "pages": pages,
+                "text": None,
+                "stem": None,
+                "single": False,
+                "size": size,
+            }
+            self._commit(staging_dir, key, manifest)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        self.evict()
+
+    def run_text(self, kind, input_path, params, convert):
+        """Return the text produced by ``convert()`` for this input, from the cache when possible."""
+        key = self.make_key(kind, input_path, params)
+        manifest = self.get(key)
+        if manifest is not None:
+            return manifest["text"]
+        text = convert()
+        self.put(key, text=text)
+        return text
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_conversion_cache():
+    """
+    Return the process-wide ConversionCache.
+
+    Located at CONVERSION_CACHE_DIR (default: a folder in the system temp directory) and capped
+    at CONVERSION_CACHE_MAX_MB megabytes (default: 1024).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            cache_dir = os.getenv("CONVERSION_CACHE_DIR") or os.path.join(
+                tempfile.gettempdir(), "tools_conversion_cache"
+            )
+            max_mb = int(os.getenv("CONVERSION_CACHE_MAX_MB", "1024"))
+            _cache = ConversionCache(cache_dir, max_bytes=max_mb * 1024 * 1024)
+        return _cache
+
+
+# ============================================================================
+# Cached Converters
+# ============================================================================
+
+
+def cached_pdf_to_png(pdf_path, output_folder=None, dpi=200, workers=1):
+    """pdf_to_png backed by the conversion cache."""
+    if output_folder is None:
+        output_folder = os.path.dirname(pdf_path)
+    return get_conversion_cache().run_files(
+        "pdf_to_png",
+        pdf_path,
+        {"dpi": dpi},
+        lambda: pdf_to_png(pdf_path, output_folder, dpi=dpi, workers=workers),
+        output_folder=output_folder,
+    )
+
+
+def cached_pptx_to_pdf(pptx_path, output_folder=None):
+    """pptx_to_pdf backed by the conversion cache."""
+    if output_folder is None:
+        output_folder = os.path.dirname(pptx_path)
+    return get_conversion_cache().run_files(
+        "pptx_to_pdf",
+        pptx_path,
+        {},
+        lambda: pptx_to_pdf(pptx_path, output_folder),
+        output_folder=output_folder,
+    )
+
+
+def cached_pptx_to_png(pptx_path, output_folder=None, workers=1):
+    """pptx_to_png backed by the conversion cache."""
+    if output_folder is None:
+        output_folder = os.path.dirname(pptx_path)
+    return get_conversion_cache().run_files(
+        "pptx_to_png",
+        pptx_path,
+        {"dpi": 200},
+        lambda: pptx_to_png(pptx_path, output_folder, workers=workers),
+        output_folder=output_folder,
+    )
+
+
+def cached_iter_pptx_to_png_bytes(pptx_path, workers=1, dpi=200):
+    """iter_pptx_to_png_bytes backed by the conversion cache."""
+    return get_conversion_cache().run_blobs(
+        "pptx_to_png_bytes",
+        pptx_path,
+        {"dpi": dpi},
+        lambda: iter_pptx_to_png_bytes(pptx_path, workers=workers, dpi=dpi),
+    )
+
+
+def cached_m4a_to_mp3(input_path, output_path=None, bitrate="192k"):
+    """m4a_to_mp3 backed by the conversion cache."""
+    if output_path is None:
+        output_path = os.path.splitext(input_path)[0] + ".mp3"
+    return get_conversion_cache().run_files(
+        "m4a_to_mp3",
+        input_path,
+        {"bitrate": bitrate},
+        lambda: m4a_to_mp3(input_path, output_path, bitrate=bitrate),
+        output_path=output_path,
+    )
+
+
+def cached_mp4_to_mp3(input_path, output_path=None, bitrate="192k"):
+    """mp4_to_mp3 backed by the conversion cache."""
+    if output_path is None:
+        output_path = os.path.splitext(input_path)[0] + ".mp3"
+    return get_conversion_cache().run_files(
+        "mp4_to_mp3",
+        input_path,
+        {"bitrate": bitrate},
+        lambda: mp4_to_mp3(input_path, output_path, bitrate=bitrate),
+        output_path=output_path,
+    )
+
+
+def cached_audio_to_subtitle(
+    file_path,
+    chunk_length_ms=10 * 60 * 1000,
+    api_key=None,
+    workers=4,
+    silence_aware=True,
+    overlap_ms=1000,
+    encoding_profile="speech_opus",
+    progress_callback=None,
+    backend=None,
+):
+    """audio_to_subtitle backed by the conversion cache (the API key is not part of the key)."""
+    return get_conversion_cache().run_text(
+        "audio_to_subtitle",
+        file_path,
+        {
+            "chunk_length_ms": chunk_length_ms,
+            "model": backend.cache_key if backend is not None else "openai:whisper-1",
+            "silence_aware": silence_aware,
+            "overlap_ms": overlap_ms,
+            "encoding_profile": encoding_profile,
+        },
+        lambda: audio_to_subtitle(
+            file_path,
+            chunk_length_ms=chunk_length_ms,
+            api_key=api_key,
+            workers=workers,
+            silence_aware=silence_aware,
+            overlap_ms=overlap_ms,
+            encoding_profile=encoding_profile,
+            progress_callback=progress_callback,
+            backend=backend,
+        ),
+    )
@@ -0,0 +1,195 @@
+"""
+Process-wide registry of OpenAI-compatible clients for the supported LLM providers.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+
+# Provider endpoints and the environment variable holding each provider's API key
+PROVIDERS: Dict[str, Dict[str, Optional[str]]] = {
+    "dashscope": {
+        "base_url": "https://dashscope.aliyuncs.com/compatible-mode/v1",
+        "api_key_env": "DASHSCOPE_API_KEY",
+    },
+    "openrouter": {
+        "base_url": "https://openrouter.ai/api/v1",
+        "api_key_env": "OPENROUTER_API_KEY",
+    },
+    "openai": {
+        "base_url": None,
+        "api_key_env": "OPENAI_API_KEY",
+    },
+}
+
+DEFAULT_MAX_CONNECTIONS = 20
+
+_clients: Dict[Tuple[str, Optional[str], Optional[str]], Tuple[OpenAI, int]] = {}
+_clients_lock = threading.Lock()
+
+
+def _connection_limits(max_connections: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max_connections, max_keepalive_connections=max_connections
+    )
+
+
+def resolve_provider(
+    router: str, api_key: Optional[str] = None, base_url: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (api_key, base_url) to use for ``router``, filling in provider defaults."""
+    if router not in PROVIDERS:
+        raise ValueError(
+            f"Unknown provider '{router}'. Expected one of: {', '.join(PROVIDERS)}."
+        )
+    provider = PROVIDERS[router]
+    return api_key or os.getenv(provider["api_key_env"]), base_url or provider["base_url"]
+
+
+def get_client(
+    router: str,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    max_connections: Optional[int] = None,
+) -> OpenAI:
+    """
+    Return the shared client for (router, base_url, api_key), creating it on first use.
+
+    Every call with the same key reuses one client and its keep-alive connection pool,
+    so thousands of requests pay for TLS handshakes only once per connection. The pool
+    holds at least ``max_connections`` connections; asking for more than the current
+    client allows replaces it with a larger one.
+    """
+    api_key, base_url = resolve_provider(router, api_key, base_url)
+    key = (router, base_url, api_key)
+
+    with _clients_lock:
+        client, size = _clients.get(key, (None, 0))
+        wanted = max(max_connections or 0, size, DEFAULT_MAX_CONNECTIONS)
+        if client is None or wanted > size:
+            # A replaced client is left open: other threads may still be using it
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=DefaultHttpxClient(limits=_connection_limits(wanted)),
+            )
+            _clients[key] = (client, wanted)
+        return client
+
+
+def create_async_client(
+    router: str,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+) -> AsyncOpenAI:
+    """
+    Create an async client for ``router`` with SDK retries disabled.
+
+    Async clients are bound to the event loop they are first used on, so they are not
+    shared through the registry; the caller owns the client and should close it.
+    """
+    api_key, base_url = resolve_provider(router, api_key, base_url)
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,
+        http_client=DefaultAsyncHttpxClient(limits=_connection_limits(max_connections)),
+    )
+
+
+def create_completion(
+    client,
+    router: str,
+    model: str,
+    system: str,
+    prompt: str,
+    max_tokens: int = 1024,
+    temperature: float = 0.3,
+):
+    """
+    Issue one completion request on ``client`` in the form ``router`` and ``model`` expect.
+
+    Works for both OpenAI and AsyncOpenAI clients: with an async client the result is
+    awaitable. Pass the response to ``completion_text`` to read the reply.
+    """
+    if router == "openai" and model and (
+        model.startswith("gpt-4.1") or model.startswith("gpt-4o")
+    ):
+        # Use Responses API for newer models (e.g., gpt-4.1, gpt-4o)
+        return client.responses.create(
+            model=model,
+            input=prompt,
+            instructions=system,
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+        )
+
+    extra_kwargs = {}
+    if router == "openrouter":
+        # Optional attribution headers
+        extra_headers = {}
+        referer = os.getenv("OPENROUTER_SITE_URL")
+        app_title = os.getenv("OPENROUTER_APP_TITLE")
+        if referer:
+            extra_headers["HTTP-Referer"] = referer
+        if app_title:
+            extra_headers["X-Title"] = app_title
+        extra_kwargs["extra_headers"] = extra_headers
+    return client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        **extra_kwargs,
+    )
+
+
+def completion_text(response) -> str:
+    """Extract the reply text from a Chat Completions or Responses API response."""
+    if hasattr(response, "choices"):
+        return response.choices[0].message.content.strip()
+    # Prefer helper if available
+    try:
+        return response.output_text.strip()
+    except Exception:
+        # Fallback parsing if helper is unavailable
+        try:
+            segments = []
+            if hasattr(response, "output") and response.output:
+                for content_item in response.output[0].content:
+                    text_val = getattr(content_item, "text", None)
+                    if text_val:
+                        segments.append(text_val)
+            if segments:
+                return "\n".join(segments).strip()
+        except Exception:
+            pass
+        return str(response).strip()
+
+
+def completion_usage(response) -> Tuple[int, int, int]:
+    """
+    Return (input_tokens, output_tokens, cached_tokens) reported by a response, or zeros if
+    absent. cached_tokens is the part of the input served from the provider's prompt cache.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0, 0
+    # Chat Completions names them prompt/completion tokens, the Responses API input/output
+    input_tokens = getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", 0)
+    output_tokens = getattr(usage, "completion_tokens", None) or getattr(
+        usage, "output_tokens", 0
+    )
+    details = getattr(usage, "prompt_tokens_details", None) or getattr(
+        usage, "input_tokens_details", None
+    )
+    cached_tokens = getattr(details, "cached_tokens", 0) if details is not None else 0
+    return input_tokens or 0, output_tokens or 0, cached_tokens or 0
@@ -0,0 +1,349 @@
+import atexit
+import contextlib
+import functools
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SOFFICE_BINARY = "libreoffice"
+
+# The UNO client runs as a helper process so it can use the system interpreter's uno
+UNO_BRIDGE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uno_bridge.py")
+
+# Seconds a single conversion may take before soffice is assumed hung and restarted
+CONVERT_TIMEOUT = int(os.getenv("SOFFICE_CONVERT_TIMEOUT", "300"))
+
+# Seconds the bridge helper may take to answer any other request
+REQUEST_TIMEOUT = 10
+
+# Interpreters tried, in order, when UNO_PYTHON does not name one
+UNO_PYTHON_CANDIDATES = (sys.executable, "/usr/bin/python3")
+
+
+@functools.lru_cache(maxsize=None)
+def uno_python():
+    """
+    Return the first Python interpreter that can import the LibreOffice UNO bridge, or None.
+
+    Checks the ``UNO_PYTHON`` environment variable first, then this interpreter, then the
+    system ``/usr/bin/python3`` that the ``python3-uno`` package installs ``uno`` for.
+    """
+    configured = os.getenv("UNO_PYTHON")
+    for candidate in (configured,) if configured else UNO_PYTHON_CANDIDATES:
+        try:
+            result = subprocess.run(
+                [candidate, "-c", "import uno"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=30,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if result.returncode == 0:
+            return candidate
+    return None
+
+
+def uno_available():
+    """Return True if some Python interpreter can run the LibreOffice UNO bridge helper."""
+    return uno_python() is not None
+
+
+def profile_argument(profile_dir):
+    """Build the soffice argument that points it at its own user profile directory."""
+    return f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}"
+
+
+@contextlib.contextmanager
+def isolated_profile():
+    """
+    Context manager yielding a ``-env:UserInstallation`` argument for a throwaway profile.
+
+    Each soffice process needs its own profile, otherwise concurrent runs block on the
+    shared profile lock or silently do nothing.
+    """
+    profile_dir = tempfile.mkdtemp(prefix="soffice_profile_")
+    try:
+        yield profile_argument(profile_dir)
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class OfficeInstance:
+    """
+    A long-lived headless soffice process with a private profile, driven over UNO.
+
+    The UNO calls are made by a ``uno_bridge.py`` helper process running under
+    ``uno_python()``, one per instance, so the app's own interpreter never imports ``uno``.
+    """
+
+    def __init__(
+        self,
+        binary=SOFFICE_BINARY,
+        startup_timeout=60,
+        convert_timeout=CONVERT_TIMEOUT,
+        request_timeout=REQUEST_TIMEOUT,
+    ):
+        self.binary = binary
+        self.startup_timeout = startup_timeout
+        self.convert_timeout = convert_timeout
+        self.request_timeout = request_timeout
+        self.port = None
+        self.profile_dir = None
+        self.process = None
+        self.bridge = None
+        self.replies = None
+
+    def start(self):
+        """Launch soffice and its bridge helper, and wait until the bridge has connected."""
+        python = uno_python()
+        if python is None:
+            raise RuntimeError("No Python interpreter with the LibreOffice UNO bridge found")
+        self.port = _free_port()
+        self.profile_dir = tempfile.mkdtemp(prefix="soffice_profile_")
+        command = [
+            self.binary,
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--nodefault",
+            "--norestore",
+            "--nolockcheck",
+            profile_argument(self.profile_dir),
+            f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext",
+        ]
+        self.process = subprocess.Popen(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.bridge = subprocess.Popen(
+            [python, UNO_BRIDGE_SCRIPT, str(self.port)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        # Replies are read on a thread so every request can wait with a deadline
+        self.replies = queue.Queue()
+        threading.Thread(
+            target=_read_replies, args=(self.bridge.stdout, self.replies), daemon=True
+        ).start()
+
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                self._request("connect")
+                return
+            except Exception:
+                if self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError("LibreOffice daemon exited during startup")
+                if self.bridge.poll() is not None:
+                    self.stop()
+                    raise RuntimeError("LibreOffice UNO bridge exited during startup")
+                if time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError(
+                        f"LibreOffice daemon did not accept connections within {self.startup_timeout}s"
+                    )
+                time.sleep(0.25)
+
+    def _request(self, command, timeout=None, **arguments):
+        """
+        Send one command to the bridge helper and raise RuntimeError if it fails.
+
+        Waits at most ``timeout`` seconds (request_timeout by default) for the reply; past
+        that soffice is assumed hung, both processes are killed and TimeoutError is raised.
+        """
+        if self.bridge is None or self.bridge.poll() is not None:
+            raise RuntimeError("LibreOffice UNO bridge is not running")
+        if timeout is None:
+            timeout = self.request_timeout
+        try:
+            self.bridge.stdin.write(json.dumps({"command": command, **arguments}) + "\n")
+            self.bridge.stdin.flush()
+        except OSError as e:
+            raise RuntimeError(f"LibreOffice UNO bridge failed: {e}")
+        try:
+            line = self.replies.get(timeout=timeout)
+        except queue.Empty:
+            self._kill()
+            raise TimeoutError(f"LibreOffice did not finish {command!r} within {timeout}s")
+        if not line:
+            raise RuntimeError("LibreOffice UNO bridge exited")
+        reply = json.loads(line)
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+
+    def is_healthy(self):
+        """Check that the process is alive and still answers UNO calls."""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            self._request("ping")
+        except Exception:
+            return False
+        return True
+
+    def _kill(self):
+        """Kill soffice and the bridge helper without asking them to quit."""
+        for process in (self.bridge, self.process):
+            if process is not None and process.poll() is None:
+                process.kill()
+                process.wait()
+
+    def stop(self):
+        """Terminate soffice, its bridge helper, and remove its profile."""
+        terminated = False
+        if self.bridge is not None:
+            try:
+                self._request("terminate")
+                terminated = True
+            except Exception:
+                pass  # The bridge is already gone when the process has crashed
+            if not terminated and self.bridge.poll() is None:
+                self.bridge.kill()
+            try:
+                self.bridge.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.bridge.kill()
+                self.bridge.wait()
+            self.bridge.stdin.close()
+            self.bridge.stdout.close()
+            self.bridge = None
+        if self.process is not None:
+            if not terminated and self.process.poll() is None:
+                self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def convert_to_pdf(self, input_path, output_path):
+        """Load ``input_path`` hidden in this instance and export it to ``output_path`` as PDF."""
+        self._request(
+            "convert",
+            timeout=self.convert_timeout,
+            input=os.path.abspath(input_path),
+            output=os.path.abspath(output_path),
+        )
+        return output_path
+
+
+def _read_replies(stream, replies):
+    """Forward each reply line of a bridge helper to ``replies``, then "" once it exits."""
+    try:
+        for line in stream:
+            replies.put(line)
+    except (OSError, ValueError):
+        pass  # stop() closed the pipe
+    replies.put("")
+
+
+class OfficePool:
+    """
+    A small pool of OfficeInstance daemons that conversions are dispatched to.
+
+    Each instance handles one document at a time; a conversion that finds its instance
+    unhealthy, or that fails because the instance died, restarts it and retries once. A
+    conversion that runs past ``convert_timeout`` restarts the instance and is not retried.
+    """
+
+    def __init__(self, size=2, binary=SOFFICE_BINARY, convert_timeout=CONVERT_TIMEOUT):
+        self.size = size
+        self.binary = binary
+        self.convert_timeout = convert_timeout
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._instances = []
+        self._closed = False
+
+    def _acquire(self):
+        # Reserve a slot under the lock, but start the instance outside it: startup takes
+        # seconds, and other callers may meanwhile take idle instances
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("LibreOffice pool is closed")
+            if not (self._idle.empty() and len(self._instances) < self.size):
+                instance = None
+            else:
+                instance = OfficeInstance(self.binary, convert_timeout=self.convert_timeout)
+                self._instances.append(instance)
+        if instance is None:
+            return self._idle.get()
+        try:
+            instance.start()
+        except Exception:
+            with self._lock:
+                if instance in self._instances:
+                    self._instances.remove(instance)
+            raise
+        with self._lock:
+            closed = self._closed
+        if closed:
+            instance.stop()  # close() ran while it was starting
+            raise RuntimeError("LibreOffice pool is closed")
+        return instance
+
+    def convert_to_pdf(self, input_path, output_path):
+        """Convert ``input_path`` to PDF at ``output_path`` on the next idle instance."""
+        instance = self._acquire()
+        try:
+            if not instance.is_healthy():
+                instance.restart()
+            try:
+                return instance.convert_to_pdf(input_path, output_path)
+            except TimeoutError:
+                instance.restart()  # The document hung soffice; retrying would hang again
+                raise
+            except Exception:
+                if instance.is_healthy():
+                    raise  # The document itself failed, not the daemon
+                instance.restart()
+                return instance.convert_to_pdf(input_path, output_path)
+        finally:
+            self._idle.put(instance)
+
+    def close(self):
+        """Stop every instance in the pool."""
+        with self._lock:
+            self._closed = True
+            instances, self._instances = self._instances, []
+        for instance in instances:
+            instance.stop()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_office_pool():
+    """Return the process-wide OfficePool, sized by the SOFFICE_POOL_SIZE environment variable."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OfficePool(size=int(os.getenv("SOFFICE_POOL_SIZE", "2")))
+            atexit.register(_pool.close)
+        return _pool
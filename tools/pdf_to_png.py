@@ -1,26 +1,187 @@
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+import concurrent.futures
 import os
+import subprocess
+import tempfile
 
+# Every PNG ends with an empty IEND chunk followed by its fixed CRC
+PNG_END = b"IEND\xaeB`\x82"
 
-def pdf_to_png(pdf_path, output_folder=None, dpi=200):
+
+def _page_windows(page_count, batch_size, workers):
+    """Split pages 1..page_count into (first_page, last_page) windows of at most batch_size pages."""
+    # Keep every worker busy on short documents
+    batch_size = max(1, min(batch_size, -(-page_count // workers)))
+    return [
+        (first_page, min(first_page + batch_size - 1, page_count))
+        for first_page in range(1, page_count + 1, batch_size)
+    ]
+
+
+def iter_pdf_to_png(pdf_path, output_folder=None, dpi=200, batch_size=10, workers=1):
     """
-    Converts each page of the input PDF to a PNG image.
+    Converts each page of the input PDF to a PNG image, yielding each path as soon as it is saved.
+
+    Pages are rendered by poppler straight to PNG files in windows of ``batch_size`` pages,
+    so no decoded page is ever held in memory and peak usage stays flat regardless of page count.
+    With ``workers > 1`` the windows are rendered by that many poppler processes in parallel.
 
     Args:
         pdf_path (str): Path to the input PDF file.
         output_folder (str, optional): Directory to save PNG images. Defaults to PDF's directory.
         dpi (int, optional): Dots per inch for the output images. Defaults to 200.
+        batch_size (int, optional): Maximum number of pages rendered per poppler call. Defaults to 10.
+        workers (int, optional): Number of poppler processes rendering concurrently. Defaults to 1.
 
-    Returns:
-        List[str]: List of file paths to the generated PNG images.
+    Yields:
+        str: Path to each generated PNG image, in page order.
     """
     if output_folder is None:
         output_folder = os.path.dirname(pdf_path)
-    images = convert_from_path(pdf_path, dpi=dpi)
-    output_files = []
     base_name = os.path.splitext(os.path.basename(pdf_path))[0]
-    for i, image in enumerate(images):
-        output_file = os.path.join(output_folder, f"{base_name}_page_{i+1}.png")
-        image.save(output_file, "PNG")
-        output_files.append(output_file)
-    return output_files
+    page_count = pdfinfo_from_path(pdf_path)["Pages"]
+    workers = max(1, int(workers))
+    windows = _page_windows(page_count, batch_size, workers)
+
+    # Stage inside the output folder so finished pages can be moved into place without copying
+    with tempfile.TemporaryDirectory(dir=output_folder) as staging_dir:
+
+        def render_window(window):
+            first_page, last_page = window
+            rendered = convert_from_path(
+                pdf_path,
+                dpi=dpi,
+                first_page=first_page,
+                last_page=last_page,
+                output_folder=staging_dir,
+                # Fixed-width prefix so no window's files match another window's prefix
+                output_file=f"w{first_page:06d}",
+                fmt="png",
+                paths_only=True,
+            )
+            output_files = []
+            for page_number, rendered_path in zip(
+                range(first_page, last_page + 1), rendered
+            ):
+                output_file = os.path.join(
+                    output_folder, f"{base_name}_page_{page_number}.png"
+                )
+                os.replace(rendered_path, output_file)
+                output_files.append(output_file)
+            return output_files
+
+        if workers == 1:
+            for window in windows:
+                yield from render_window(window)
+            return
+
+        # Poppler does the rendering in child processes, so threads are enough to drive them
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for output_files in executor.map(render_window, windows):
+                yield from output_files
+
+
+def iter_pdf_to_png_bytes(pdf_path, dpi=200, batch_size=10, workers=1):
+    """
+    Renders each page of the input PDF to PNG bytes in memory, without touching the disk.
+
+    poppler encodes the PNGs itself and streams them over stdout, so each page is rendered
+    and encoded exactly once and never decoded into a PIL image.
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        dpi (int, optional): Dots per inch for the output images. Defaults to 200.
+        batch_size (int, optional): Maximum number of pages rendered per poppler call. Defaults to 10.
+        workers (int, optional): Number of poppler processes rendering concurrently. Defaults to 1.
+
+    Yields:
+        Tuple[int, bytes]: Page number (1-based) and PNG bytes of each page, in page order.
+    """
+    page_count = pdfinfo_from_path(pdf_path)["Pages"]
+    workers = max(1, int(workers))
+    windows = _page_windows(page_count, batch_size, workers)
+
+    def render_window(window):
+        first_page, last_page = window
+        command = [
+            "pdftoppm",
+            "-png",
+            "-r",
+            str(dpi),
+            "-f",
+            str(first_page),
+            "-l",
+            str(last_page),
+            pdf_path,
+        ]
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise RuntimeError(f"pdftoppm failed: {result.stderr.decode()}")
+        pages = []
+        start = 0
+        while True:
+            end = result.stdout.find(PNG_END, start)
+            if end == -1:
+                break
+            end += len(PNG_END)
+            pages.append(result.stdout[start:end])
+            start = end
+        if len(pages) != last_page - first_page + 1:
+            raise RuntimeError(
+                f"pdftoppm returned {len(pages)} page(s) for pages {first_page}-{last_page}"
+            )
+        return list(zip(range(first_page, last_page + 1), pages))
+
+    if workers == 1:
+        for window in windows:
+            yield from render_window(window)
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for pages in executor.map(render_window, windows):
+            yield from pages
+
+
+def pdf_to_png(pdf_path, output_folder=None, dpi=200, workers=1):
+    """
+    Converts each page of the input PDF to a PNG image.
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        output_folder (str, optional): Directory to save PNG images. Defaults to PDF's directory.
+        dpi (int, optional): Dots per inch for the output images. Defaults to 200.
+        workers (int, optional): Number of pages rendered in parallel. Defaults to 1.
+
+    Returns:
+        List[str]: List of file paths to the generated PNG images, in page order.
+    """
+    return list(iter_pdf_to_png(pdf_path, output_folder, dpi=dpi, workers=workers))
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Rasterize a PDF to PNG and report throughput for each worker count."
+    )
+    parser.add_argument("input", help="Input PDF file path")
+    parser.add_argument("--dpi", type=int, default=200, help="Render DPI (default: 200)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Worker counts to benchmark (default: 1 2 4 8)",
+    )
+    args = parser.parse_args()
+
+    for worker_count in args.workers:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            started = time.perf_counter()
+            pages = pdf_to_png(args.input, temp_dir, dpi=args.dpi, workers=worker_count)
+            elapsed = time.perf_counter() - started
+        print(
+            f"workers={worker_count}: {len(pages)} pages in {elapsed:.2f}s "
+            f"({len(pages) / elapsed:.2f} pages/sec)"
+        )
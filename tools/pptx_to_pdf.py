@@ -1,18 +1,24 @@
 import os
 import sys
 import platform
+import shutil
 import subprocess
+import tempfile
+import concurrent.futures
+from .office_daemon import get_office_pool, isolated_profile, uno_available
 
 
-def pptx_to_pdf(pptx_path, output_folder=None):
+def pptx_to_pdf(pptx_path, output_folder=None, use_daemon=True):
     """
     Converts a PPTX file to PDF.
     - On Windows: Uses Microsoft PowerPoint via COM automation.
-    - On Linux: Uses LibreOffice in headless mode.
+    - On Linux: Uses a persistent LibreOffice daemon pool when the UNO bridge is available,
+      otherwise a one-off headless LibreOffice run with its own profile.
 
     Args:
         pptx_path (str): Path to the input PPTX file.
         output_folder (str, optional): Directory to save the PDF. Defaults to PPTX's directory.
+        use_daemon (bool, optional): Dispatch to the LibreOffice daemon pool on Linux. Defaults to True.
 
     Returns:
         str: Path to the generated PDF file.
@@ -49,16 +55,26 @@ def pptx_to_pdf(pptx_path, output_folder=None):
         return pdf_path
 
     elif system == "Linux":
-        command = [
-            "libreoffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            output_folder,
-            pptx_path,
-        ]
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if use_daemon and uno_available():
+            get_office_pool().convert_to_pdf(pptx_path, pdf_path)
+            if not os.path.exists(pdf_path):
+                raise FileNotFoundError(f"PDF not created: {pdf_path}")
+            return pdf_path
+
+        with isolated_profile() as profile:
+            command = [
+                "libreoffice",
+                profile,
+                "--headless",
+                "--convert-to",
+                "pdf",
+                "--outdir",
+                output_folder,
+                pptx_path,
+            ]
+            result = subprocess.run(
+                command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
         if result.returncode != 0:
             raise RuntimeError(
                 f"LibreOffice conversion failed: {result.stderr.decode()}"
@@ -75,3 +91,136 @@ def pptx_to_pdf(pptx_path, output_folder=None):
 
     else:
         raise NotImplementedError(f"pptx_to_pdf is not supported on {system}.")
+
+
+def _convert_group_with_libreoffice(pptx_paths, output_dir):
+    """Convert several PPTX files with a single LibreOffice invocation on its own profile."""
+    with isolated_profile() as profile:
+        command = [
+            "libreoffice",
+            profile,
+            "--headless",
+            "--convert-to",
+            "pdf",
+            "--outdir",
+            output_dir,
+            *pptx_paths,
+        ]
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            # E.g. libreoffice is not installed: every input of the group fails, not the batch
+            return [(None, f"LibreOffice conversion failed: {e}")] * len(pptx_paths)
+    produced = {file.lower(): file for file in os.listdir(output_dir)}
+    outcomes = []
+    for pptx_path in pptx_paths:
+        base_name = os.path.splitext(os.path.basename(pptx_path))[0]
+        file = produced.get(f"{base_name}.pdf".lower())
+        if file is not None:
+            outcomes.append((os.path.join(output_dir, file), None))
+        elif result.returncode != 0:
+            outcomes.append(
+                (None, f"LibreOffice conversion failed: {result.stderr.decode()}")
+            )
+        else:
+            outcomes.append((None, f"PDF not created for {pptx_path}"))
+    return outcomes
+
+
+def _pdf_name(base_name, occurrence, claimed):
+    """
+    File name for the PDF of the ``occurrence``-th batch input named ``base_name``.
+
+    The first keeps the plain name; later ones are numbered, skipping (and then adding
+    to) the lower-cased names in ``claimed``.
+    """
+    if not occurrence:
+        return f"{base_name}.pdf"
+    number = occurrence + 1
+    while f"{base_name}_{number}.pdf".lower() in claimed:
+        number += 1
+    file_name = f"{base_name}_{number}.pdf"
+    claimed.add(file_name.lower())
+    return file_name
+
+
+def pptx_to_pdf_batch(pptx_paths, output_folder, workers=2):
+    """
+    Converts many PPTX files to PDF.
+    - On Linux: Groups the inputs into at most ``workers`` LibreOffice invocations per round,
+      each converting many files on its own isolated profile, so N decks do not cost N cold starts.
+    - Elsewhere: Converts the files one at a time with pptx_to_pdf.
+
+    Inputs sharing a file name are spread over separate rounds and their PDFs are
+    numbered (``deck.pdf``, ``deck_2.pdf``), skipping names another input of the batch
+    converts to, so that none overwrites another.
+
+    Args:
+        pptx_paths (List[str]): Paths to the input PPTX files.
+        output_folder (str): Directory to save the PDFs.
+        workers (int, optional): Number of LibreOffice processes run in parallel. Defaults to 2.
+
+    Returns:
+        List[dict]: One result per input, in input order, with keys ``input``,
+        ``output`` (PDF path or None) and ``error`` (message or None).
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    results = [{"input": path, "output": None, "error": None} for path in pptx_paths]
+    base_names = [os.path.splitext(os.path.basename(path))[0] for path in pptx_paths]
+
+    # How many earlier inputs share each input's file name
+    occurrences = []
+    seen_names = {}
+    for base_name in base_names:
+        occurrences.append(seen_names.get(base_name.lower(), 0))
+        seen_names[base_name.lower()] = occurrences[-1] + 1
+
+    # Names taken in the output folder; each input's own name is reserved up front
+    claimed = {f"{base_name}.pdf".lower() for base_name in base_names}
+
+    if platform.system() != "Linux":
+        # Converted into a staging folder first, as a duplicate would overwrite its namesake
+        with tempfile.TemporaryDirectory(dir=output_folder) as staging_dir:
+            for i, result in enumerate(results):
+                try:
+                    staged_path = pptx_to_pdf(result["input"], staging_dir)
+                    pdf_path = os.path.join(
+                        output_folder, _pdf_name(base_names[i], occurrences[i], claimed)
+                    )
+                    shutil.move(staged_path, pdf_path)
+                    result["output"] = pdf_path
+                except Exception as e:
+                    result["error"] = str(e)
+        return results
+
+    # Round r holds the r-th input of each file name, so no invocation sees duplicate names
+    rounds = [[] for _ in range(max(occurrences, default=-1) + 1)]
+    for i, occurrence in enumerate(occurrences):
+        rounds[occurrence].append(i)
+
+    workers = max(1, int(workers))
+    with tempfile.TemporaryDirectory(dir=output_folder) as staging_dir:
+        for round_number, indices in enumerate(rounds):
+            groups = [indices[g::workers] for g in range(workers) if indices[g::workers]]
+            group_dirs = [
+                os.path.join(staging_dir, f"r{round_number}_g{g}") for g in range(len(groups))
+            ]
+            for group_dir in group_dirs:
+                os.makedirs(group_dir)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                group_outcomes = executor.map(
+                    _convert_group_with_libreoffice,
+                    [[pptx_paths[i] for i in group] for group in groups],
+                    group_dirs,
+                )
+                for group, outcomes in zip(groups, group_outcomes):
+                    for i, (staged_path, error) in zip(group, outcomes):
+                        if error is not None:
+                            results[i]["error"] = error
+                            continue
+                        pdf_path = os.path.join(
+                            output_folder, _pdf_name(base_names[i], round_number, claimed)
+                        )
+                        shutil.move(staged_path, pdf_path)
+                        results[i]["output"] = pdf_path
+    return results
@@ -1,23 +1,46 @@
 import os
 import tempfile
 from .pptx_to_pdf import pptx_to_pdf
-from .pdf_to_png import pdf_to_png
+from .pdf_to_png import pdf_to_png, iter_pdf_to_png_bytes
 
 
-def pptx_to_png(pptx_path, output_folder=None):
+def pptx_to_png(pptx_path, output_folder=None, workers=1):
     """
     Converts each slide of the input PPTX to a PNG image.
 
     Args:
         pptx_path (str): Path to the input PPTX file.
         output_folder (str, optional): Directory to save PNG images. Defaults to PPTX's directory.
+        workers (int, optional): Number of slides rendered in parallel. Defaults to 1.
 
     Returns:
         List[str]: List of file paths to the generated PNG images.
     """
+    if output_folder is None:
+        output_folder = os.path.dirname(pptx_path)
     # Step 1: Convert PPTX to PDF
     with tempfile.TemporaryDirectory() as temp_dir:
         pdf_path = pptx_to_pdf(pptx_path, temp_dir)
         # Step 2: Convert PDF to PNG
-        png_files = pdf_to_png(pdf_path, output_folder)
+        png_files = pdf_to_png(pdf_path, output_folder, workers=workers)
     return png_files
+
+
+def iter_pptx_to_png_bytes(pptx_path, workers=1, dpi=200):
+    """
+    Renders each slide of the input PPTX to PNG bytes in memory.
+
+    Only the intermediate PDF touches the disk; each slide is rendered and encoded once,
+    so callers can put the same bytes into a ZIP, a preview and a download without re-reading.
+
+    Args:
+        pptx_path (str): Path to the input PPTX file.
+        workers (int, optional): Number of slides rendered in parallel. Defaults to 1.
+        dpi (int, optional): Dots per inch for the output images. Defaults to 200.
+
+    Yields:
+        Tuple[int, bytes]: Slide number (1-based) and PNG bytes of each slide, in slide order.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = pptx_to_pdf(pptx_path, temp_dir)
+        yield from iter_pdf_to_png_bytes(pdf_path, dpi=dpi, workers=workers)
@@ -0,0 +1,34 @@
+from openai import (
+    RateLimitError,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+)
+import random
+import time
+
+# Errors worth retrying: throttling, dropped connections and provider-side failures
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+def retry_delay(error, attempt, base_delay=1.0, max_delay=60.0):
+    """Seconds to wait before retry ``attempt``: the server's Retry-After if given, else jittered backoff."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(max_delay, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def call_with_retries(call, max_retries=5):
+    """Run ``call()``, retrying rate-limit and transient API errors with exponential backoff."""
+    for attempt in range(max_retries + 1):
+        try:
+            return call()
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            time.sleep(retry_delay(e, attempt))
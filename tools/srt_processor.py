@@ -2,12 +2,21 @@
 Unified SRT processing module combining resegmentation and translation functionality.
 """
 
+import asyncio
+import bisect
+import functools
+import glob
+import json
 import os
 import re
-import concurrent.futures
-from typing import List, Tuple, Optional
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
 from dotenv import load_dotenv
-from openai import OpenAI
+
+from .hashing import file_sha256
+from .translation_engine import TranslationEngine
+from .translation_memory import TranslationMemory, get_translation_memory
 
 # Load environment variables from .env if present
 load_dotenv(override=True)
@@ -30,43 +39,202 @@ def write_srt(file_path: str, content: str) -> None:
         f.write(content)
 
 
-def parse_srt_blocks(srt_content: str) -> List[Tuple[str, str, List[str]]]:
+class Cue:
+    """One subtitle cue, with its timings parsed once into integer milliseconds."""
+
+    __slots__ = ("index", "start_ms", "end_ms", "lines")
+
+    def __init__(self, index: int, start_ms: int, end_ms: int, lines: List[str]):
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.lines = lines
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def to_srt(self) -> str:
+        """Format the cue as an SRT block (without a trailing blank line)."""
+        return (
+            f"{self.index}\n{ms_to_time_str(self.start_ms)} --> "
+            f"{ms_to_time_str(self.end_ms)}\n" + "\n".join(self.lines)
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Cue):
+            return NotImplemented
+        return (self.index, self.start_ms, self.end_ms, self.lines) == (
+            other.index,
+            other.start_ms,
+            other.end_ms,
+            other.lines,
+        )
+
+    def __repr__(self) -> str:
+        return f"Cue({self.index}, {self.start_ms}, {self.end_ms}, {self.lines!r})"
+
+
+# Cue timing line, SRT ("00:01:02,500") or WebVTT ("01:02.500", optional hours and
+# trailing cue settings)
+TIME_LINE_RE = re.compile(
+    r"\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*"
+    r"(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})"
+)
+
+# Canonical SRT timing line, matched first because nearly every file uses it
+SRT_TIME_LINE_RE = re.compile(
+    r"(\d\d):(\d\d):(\d\d),(\d\d\d) --> (\d\d):(\d\d):(\d\d),(\d\d\d)"
+)
+
+# WebVTT blocks that carry no cue
+VTT_SKIPPED_BLOCKS = ("NOTE", "STYLE", "REGION")
+
+
+class ParseIssue(NamedTuple):
+    """A cue the parser skipped or repaired, with the 1-based line it was found on."""
+
+    line: int
+    message: str
+
+
+def iter_srt_cues(
+    lines: Iterable[str], issues: Optional[List[ParseIssue]] = None
+) -> Iterator[Cue]:
     """
-    Parse SRT content into blocks.
-    Returns list of (index, time, text_lines).
+    Parse SRT (or WebVTT) lines into cues in a single streaming pass.
+
+    ``lines`` may be a file object, so memory stays bounded by the largest cue. A UTF-8
+    BOM, CRLF line endings, VTT headers, NOTE/STYLE/REGION blocks and VTT timestamps are
+    handled. Cues with a missing or non-numeric index, a missing blank line before the
+    next cue, or an end before their start are repaired; stray lines and cues without
+    text are skipped. Each repair or skip is appended to ``issues`` if given.
     """
-    blocks = re.split(r"\n\s*\n", srt_content.strip(), flags=re.MULTILINE)
-    parsed: List[Tuple[str, str, List[str]]] = []
-    for block in blocks:
-        lines = block.strip().splitlines()
-        if len(lines) < 3:
+
+    def report(line_number: int, message: str) -> None:
+        if issues is not None:
+            issues.append(ParseIssue(line_number, message))
+
+    match_srt_timing = SRT_TIME_LINE_RE.match
+    match_timing = TIME_LINE_RE.match
+    emitted = 0
+    cue: Optional[Cue] = None
+    cue_lines: List[str] = []
+    cue_line = 0
+    pending_index: Optional[Tuple[int, str]] = None  # Candidate index line of the next cue
+    skipping = False  # Inside a block that carries no cue (VTT header, NOTE, ...)
+    vtt = False
+
+    for line_number, line in enumerate(lines, 1):
+        # Also drops "\r\n"/"\n" and turns whitespace-only lines into blank ones
+        line = line.rstrip()
+        if line_number == 1:
+            line = line.lstrip("\ufeff")
+            if line.startswith("WEBVTT"):
+                vtt = skipping = True
+                continue
+
+        if not line:
+            if cue is not None:
+                if cue_lines:
+                    emitted += 1
+                    yield cue
+                else:
+                    report(cue_line, "Cue has no text; skipped")
+                cue = None
+            elif pending_index is not None:
+                report(pending_index[0], "Index line without a timing line; skipped")
+                pending_index = None
+            skipping = False
             continue
-        index = lines[0].strip()
-        time_line = lines[1].strip()
-        text_lines = [line.rstrip() for line in lines[2:]]
-        parsed.append((index, time_line, text_lines))
-    return parsed
 
+        timing = (
+            match_srt_timing(line) or match_timing(line) if "-->" in line else None
+        )
+        if timing is None:
+            if cue is not None:
+                cue_lines.append(line)
+            elif skipping:
+                continue
+            elif vtt and line.lstrip().startswith(VTT_SKIPPED_BLOCKS):
+                skipping = True
+            else:
+                if pending_index is not None:
+                    report(pending_index[0], "Stray line before cue; skipped")
+                # SRT indices are numbers; VTT cue identifiers may be any text
+                pending_index = (line_number, line.strip())
+            continue
 
-def parse_srt_block(block: str) -> Optional[Tuple[str, str, List[str]]]:
-    """Parse a single SRT block."""
-    lines = block.strip().splitlines()
-    if len(lines) < 3:
-        return None
-    index = lines[0]
-    time = lines[1]
-    text_lines = lines[2:]
-    return index, time, text_lines
+        skipping = False
+        index_text = None
+        if cue is not None:
+            # No blank line after the previous cue: its last line is probably our index
+            if len(cue_lines) > 1 and cue_lines[-1].strip().isdigit():
+                index_text = cue_lines.pop().strip()
+            report(line_number, "Missing blank line before cue")
+            if cue_lines:
+                emitted += 1
+                yield cue
+            else:
+                report(cue_line, "Cue has no text; skipped")
+        elif pending_index is not None:
+            index_text = pending_index[1]
+        pending_index = None
+
+        h1, m1, s1, f1, h2, m2, s2, f2 = timing.groups("0")
+        if len(f1) < 3 or len(f2) < 3:
+            # "01,5" is half a second, not 5 milliseconds
+            report(line_number, "Timestamp has fewer than 3 millisecond digits; padded")
+            f1, f2 = f1.ljust(3, "0"), f2.ljust(3, "0")
+        start_ms = ((int(h1) * 60 + int(m1)) * 60 + int(s1)) * 1000 + int(f1)
+        end_ms = ((int(h2) * 60 + int(m2)) * 60 + int(s2)) * 1000 + int(f2)
+        if end_ms < start_ms:
+            report(line_number, "Cue ends before it starts; end set to start")
+            end_ms = start_ms
+        if index_text is not None and index_text.isdigit():
+            index = int(index_text)
+        else:
+            index = emitted + 1
+            if not vtt:
+                report(line_number, f"Cue has no numeric index; numbered {index}")
+        cue_lines = []
+        cue = Cue(index, start_ms, end_ms, cue_lines)
+        cue_line = line_number
+
+    if cue is not None:
+        if cue_lines:
+            yield cue
+        else:
+            report(cue_line, "Cue has no text; skipped")
+    elif pending_index is not None:
+        report(pending_index[0], "Index line without a timing line; skipped")
 
 
-def build_srt_block(index: int, start_time: str, end_time: str, text: str) -> str:
-    """Build SRT block with index, time range, and text."""
-    return f"{index}\n{start_time} --> {end_time}\n{text}"
+def parse_srt_blocks(
+    srt_content: str, issues: Optional[List[ParseIssue]] = None
+) -> List[Cue]:
+    """Parse SRT content into cues; see iter_srt_cues."""
+    return list(iter_srt_cues(srt_content.splitlines(), issues))
 
 
-def build_srt_block_from_lines(index: str, time: str, text_lines: List[str]) -> str:
-    """Build SRT block from parsed components."""
-    return f"{index}\n{time}\n" + "\n".join(text_lines)
+def read_srt_cues(
+    file_path: str, issues: Optional[List[ParseIssue]] = None
+) -> List[Cue]:
+    """Parse an SRT file into cues, streaming it line by line."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return list(iter_srt_cues(f, issues))
+
+
+def format_srt_cues(cues: List[Cue]) -> str:
+    """Serialize cues to SRT content (without a trailing newline)."""
+    time_lines = format_time_lines(
+        np.fromiter((cue.start_ms for cue in cues), np.int64, len(cues)),
+        np.fromiter((cue.end_ms for cue in cues), np.int64, len(cues)),
+    )
+    return "\n\n".join(
+        f"{cue.index}\n{time_line}\n" + "\n".join(cue.lines)
+        for cue, time_line in zip(cues, time_lines)
+    )
 
 
 # ============================================================================
@@ -74,29 +242,6 @@ def build_srt_block_from_lines(index: str, time: str, text_lines: List[str]) ->
 # ============================================================================
 
 
-def extract_times(time_line: str) -> Tuple[str, str]:
-    """Extract start and end times from time line."""
-    # Expected format: HH:MM:SS,mmm --> HH:MM:SS,mmm
-    parts = [p.strip() for p in time_line.split("-->")]
-    if len(parts) != 2:
-        raise ValueError(f"Invalid time line: {time_line}")
-    return parts[0], parts[1]
-
-
-def time_str_to_ms(t: str) -> int:
-    """Convert time string to milliseconds."""
-    # HH:MM:SS,mmm
-    hms, ms = t.split(",")
-    hours, minutes, seconds = hms.split(":")
-    total_ms = (
-        int(hours) * 3600 * 1000
-        + int(minutes) * 60 * 1000
-        + int(seconds) * 1000
-        + int(ms)
-    )
-    return total_ms
-
-
 def ms_to_time_str(ms: int) -> str:
     """Convert milliseconds to time string."""
     if ms < 0:
@@ -110,20 +255,58 @@ def ms_to_time_str(ms: int) -> str:
     return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
 
 
+def format_time_lines(start_ms: np.ndarray, end_ms: np.ndarray) -> List[str]:
+    """Format "start --> end" timing lines for many cues at once, like ms_to_time_str."""
+    fields = []
+    for ms in (start_ms, end_ms):
+        hours, ms = np.divmod(np.maximum(ms, 0), 3600 * 1000)
+        minutes, ms = np.divmod(ms, 60 * 1000)
+        seconds, millis = np.divmod(ms, 1000)
+        fields += [hours, minutes, seconds, millis]
+    template = "%02d:%02d:%02d,%03d --> %02d:%02d:%02d,%03d"
+    return [template % row for row in zip(*(f.tolist() for f in fields))]
+
+
 # ============================================================================
 # Text Processing Utilities
 # ============================================================================
 
 
+# Sentence and clause punctuation segments are preferably cut after: Latin, CJK
+# (full- and half-width), Arabic and Devanagari forms
+PREFERRED_PUNCTUATION = ".,?!;…。，、？！；．｡､،؛؟۔।"
+# Closing quotes and brackets that stay with the punctuation before them
+CLOSING_PUNCTUATION = "\"'”’»)]}）］｝」』】〉》〕"
+
+# Cut candidates for split_text_into_chunks_by_chars_with_punctuation; a punctuation
+# match ends on the character a chunk is cut after
+SPLIT_PUNCTUATION_RE = re.compile(
+    f"[{re.escape(PREFERRED_PUNCTUATION)}][{re.escape(CLOSING_PUNCTUATION)}]*"
+)
+SPLIT_SPACE_RE = re.compile(" ")
+# Runs of text that a split should not cut through
+UNBREAKABLE_RUN_RE = re.compile(
+    f"[^ {re.escape(PREFERRED_PUNCTUATION)}]*[{re.escape(PREFERRED_PUNCTUATION)}]?"
+)
+
+# Characters that take about one token each (CJK ideographs, kana, Hangul, full-width forms)
+WIDE_CHAR_RE = re.compile(
+    "[\u1100-\u11ff\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef"
+    "\U00020000-\U0002fa1f]"
+)
+
+
 def ends_with_preferred_punctuation(text: str) -> bool:
-    """Check if text ends with preferred punctuation."""
-    stripped = text.rstrip()
-    return stripped.endswith(".") or stripped.endswith(",")
+    """Check if text ends with preferred punctuation, possibly followed by closing quotes."""
+    stripped = text.rstrip().rstrip(CLOSING_PUNCTUATION)
+    return bool(stripped) and stripped[-1] in PREFERRED_PUNCTUATION
 
 
 def normalize_whitespace(text: str) -> str:
     """Normalize whitespace in text."""
-    return re.sub(r"\s+", " ", text).strip()
+    # Same result as re.sub(r"\s+", " ", text).strip(): str.split() and \s agree on
+    # what counts as whitespace, and splitting is several times faster
+    return " ".join(text.split())
 
 
 def count_chars(text: str) -> int:
@@ -131,38 +314,89 @@ def count_chars(text: str) -> int:
     return len(text)
 
 
+def join_cue_texts(parts: List[str]) -> str:
+    """Join normalized cue texts with spaces, except between two CJK characters."""
+    text = parts[0]
+    for part in parts[1:]:
+        if WIDE_CHAR_RE.match(text[-1]) and WIDE_CHAR_RE.match(part[0]):
+            text += part
+        else:
+            text += " " + part
+    return text
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate: about four characters per token, one per CJK character."""
+    wide = len(WIDE_CHAR_RE.findall(text))
+    return wide + (len(text) - wide) // 4 + 1
+
+
+class SegmentLimits(NamedTuple):
+    """
+    Limits on resegmented cues on top of the character limit; None disables a limit.
+
+    Cues are only merged while the merged cue stays within every limit. A cue over the
+    token or duration limit is split into about as many pieces as needed to fit, cutting
+    at punctuation or spaces but never inside a word.
+    """
+
+    max_tokens: Optional[int] = None  # As counted by count_tokens
+    max_duration_ms: Optional[int] = None
+    max_chars_per_second: Optional[float] = None  # Reading speed of merged cues
+    count_tokens: Callable[[str], int] = estimate_tokens
+
+
+def split_char_limit(
+    text: str, tokens: int, duration_ms: int, max_chars: int, limits: SegmentLimits
+) -> int:
+    """Characters per chunk a cue must be split into to respect max_chars and ``limits``."""
+    chars = count_chars(text)
+    wanted = chars
+    if limits.max_tokens and tokens > limits.max_tokens:
+        wanted = min(wanted, chars * limits.max_tokens // tokens)
+    if limits.max_duration_ms and duration_ms > limits.max_duration_ms:
+        # Chunks get time in proportion to their characters
+        wanted = min(wanted, chars * limits.max_duration_ms // duration_ms)
+    if wanted >= chars:
+        return max_chars
+    # Only max_chars may cut through a word
+    longest_run = max(map(len, UNBREAKABLE_RUN_RE.findall(text)))
+    return min(max_chars, max(wanted, longest_run))
+
+
 def split_text_into_chunks_by_chars_with_punctuation(
     text: str, max_chars: int
 ) -> List[str]:
     """Split text into chunks respecting punctuation boundaries."""
     text = normalize_whitespace(text)
+    # Find every cut candidate once; each cut is then a binary search, so long
+    # texts split in linear time without copying the rest of the text per chunk
+    punctuation = [m.end() - 1 for m in SPLIT_PUNCTUATION_RE.finditer(text)]
+    spaces = [m.start() for m in SPLIT_SPACE_RE.finditer(text)]
     chunks: List[str] = []
     i = 0
     n = len(text)
     while i < n:
-        remaining = text[i:]
-        if len(remaining) <= max_chars:
-            chunks.append(remaining.strip())
+        if n - i <= max_chars:
+            chunks.append(text[i:].strip())
             break
-        window = remaining[:max_chars]
-        # Prefer last '.' or ',' within the window
-        last_dot = window.rfind(".")
-        last_comma = window.rfind(",")
-        cut_at = max(last_dot, last_comma)
-        if cut_at != -1:
-            end = cut_at + 1
+        limit = i + max_chars
+        # Prefer last sentence or clause punctuation within the window
+        k = bisect.bisect_left(punctuation, limit) - 1
+        if k >= 0 and punctuation[k] >= i:
+            end = punctuation[k] + 1
         else:
             # If no punctuation found, look for the last space to avoid cutting words
-            last_space = window.rfind(" ")
-            if last_space != -1:
-                end = last_space
+            k = bisect.bisect_left(spaces, limit) - 1
+            if k >= 0 and spaces[k] >= i:
+                end = spaces[k]
             else:
                 # If no space found, we have to cut at max_chars (single long word)
-                end = max_chars
-        chunk = remaining[:end].strip()
+                end = limit
+        chunk = text[i:end].strip()
         if chunk:
             chunks.append(chunk)
-        i += end
+        i = end
         # Skip any following spaces before next chunk
         while i < n and text[i] == " ":
             i += 1
@@ -173,154 +407,312 @@ def split_text_into_chunks_by_chars_with_punctuation(
 # Translation Functionality
 # ============================================================================
 
+SYSTEM_PROMPT = "You are a helpful assistant that translates subtitles."
+
+# Delimits numbered segments in batched translation requests and responses
+SEGMENT_MARKER_RE = re.compile(r"^\[\[(\d+)\]\]\s*$")
+
+
+def build_translate_prompt(text: str, target_lang: str) -> str:
+    """Build the prompt for translating a single subtitle text."""
+    return (
+        f"Translate the following subtitle text to {target_lang}. "
+        "Do not translate timestamps or numbers. Only translate the spoken text. "
+        "Return only the translated text, no explanations or formatting.\n\n"
+        f"{text}"
+    )
+
+
+def build_batch_prompt(texts: List[str], target_lang: str) -> str:
+    """Build a prompt asking for every numbered segment to be translated in place."""
+    segments = "\n".join(f"[[{i}]]\n{text}" for i, text in enumerate(texts, 1))
+    return (
+        f"Translate each numbered subtitle segment below to {target_lang}. "
+        "Do not translate timestamps or numbers. Only translate the spoken text. "
+        f"Return exactly {len(texts)} segments in the same order, each preceded by its "
+        "marker (e.g. [[1]]) on a line of its own, with no explanations or other text.\n\n"
+        f"{segments}"
+    )
+
 
-def translate_text(
-    text: str, target_lang: str, model: str, router: str = "dashscope"
+# Instructions of context-window requests. They come first and depend only on the target
+# language, so every request of a run starts with the same bytes and providers can serve
+# that prefix from their prompt cache
+CONTEXT_PROMPT = (
+    'Translate the numbered subtitle segments under "Segments:" to {target_lang}. '
+    'The subtitles under "Context before:" and "Context after:" come just before and after '
+    "them; use them only to follow sentences across segments, and do not translate or "
+    "return them. Do not translate timestamps or numbers. Only translate the spoken text. "
+    "Return every segment in the same order, each preceded by its marker (e.g. [[1]]) on a "
+    "line of its own, with no explanations or other text."
+)
+
+
+def build_context_prompt(
+    texts: List[str], target_lang: str, before: List[str], after: List[str]
 ) -> str:
-    """Translate text using specified provider."""
-    if router == "dashscope":
-        client = OpenAI(
-            api_key=os.getenv("DASHSCOPE_API_KEY"),
-            base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-        )
-        prompt = (
-            f"Translate the following subtitle text to {target_lang}. "
-            "Do not translate timestamps or numbers. Only translate the spoken text. "
-            "Return only the translated text, no explanations or formatting.\n\n"
-            f"{text}"
-        )
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that translates subtitles.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-            max_tokens=1024,
-        )
-        return response.choices[0].message.content.strip()
+    """Build a prompt translating numbered segments with neighbouring cues as read-only context."""
+    segments = "\n".join(f"[[{i}]]\n{text}" for i, text in enumerate(texts, 1))
+    return (
+        CONTEXT_PROMPT.format(target_lang=target_lang)
+        + "\n\nContext before:\n"
+        + ("\n".join(before) or "(none)")
+        + "\n\nSegments:\n"
+        + segments
+        + "\n\nContext after:\n"
+        + ("\n".join(after) or "(none)")
+    )
 
-    elif router == "openrouter":
-        client = OpenAI(
-            api_key=os.getenv("OPENROUTER_API_KEY"),
-            base_url="https://openrouter.ai/api/v1",
-        )
-        prompt = (
-            f"Translate the following subtitle text to {target_lang}. "
-            "Do not translate timestamps or numbers. Only translate the spoken text. "
-            "Return only the translated text, no explanations or formatting.\n\n"
-            f"{text}"
-        )
-        # Optional attribution headers
-        extra_headers = {}
-        referer = os.getenv("OPENROUTER_SITE_URL")
-        app_title = os.getenv("OPENROUTER_APP_TITLE")
-        if referer:
-            extra_headers["HTTP-Referer"] = referer
-        if app_title:
-            extra_headers["X-Title"] = app_title
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that translates subtitles.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-            max_tokens=1024,
-            extra_headers=extra_headers,
+
+def parse_batch_response(response: str, expected: int) -> Optional[List[str]]:
+    """
+    Split a batched reply back into per-segment texts.
+    Returns None unless markers 1..expected each appear once, in order, with non-empty text.
+    """
+    numbers: List[int] = []
+    texts: List[List[str]] = []
+    for line in response.splitlines():
+        match = SEGMENT_MARKER_RE.match(line.strip())
+        if match:
+            numbers.append(int(match.group(1)))
+            texts.append([])
+        elif texts:
+            texts[-1].append(line)
+        elif line.strip():
+            return None  # Text before the first marker
+    if numbers != list(range(1, expected + 1)):
+        return None
+    parsed = ["\n".join(lines).strip() for lines in texts]
+    if not all(parsed):
+        return None
+    return parsed
+
+
+async def translate_batch(
+    engine: TranslationEngine,
+    texts: List[str],
+    target_lang: str,
+    context: Optional[Tuple[List[str], List[str]]] = None,
+) -> List[str]:
+    """
+    Translate several subtitle texts in one request through ``engine``.
+    With ``context`` (the source texts before and after them), the neighbouring cues are
+    sent along as read-only context.
+    Falls back to requests without context, then to one request per text, if the reply
+    does not line up with the input.
+    """
+    # The reply budget follows the segments; rate limiting counts the whole prompt
+    estimated = sum(estimate_tokens(t) for t in texts)
+    max_tokens = min(8192, max(1024, 3 * estimated))
+    if context is not None:
+        prompt = build_context_prompt(texts, target_lang, *context)
+        parsed = parse_batch_response(
+            await engine.complete(
+                prompt, max_tokens=max_tokens, estimated_tokens=estimate_tokens(prompt)
+            ),
+            len(texts),
         )
-        return response.choices[0].message.content.strip()
-
-    elif router == "openai":
-        client = OpenAI()
-        prompt = (
-            f"Translate the following subtitle text to {target_lang}. "
-            "Do not translate timestamps or numbers. Only translate the spoken text. "
-            "Return only the translated text, no explanations or formatting.\n\n"
-            f"{text}"
+        if parsed is not None:
+            return parsed
+    if len(texts) == 1:
+        prompt = build_translate_prompt(texts[0], target_lang)
+        return [await engine.complete(prompt, estimated_tokens=estimate_tokens(prompt))]
+    prompt = build_batch_prompt(texts, target_lang)
+    parsed = parse_batch_response(
+        await engine.complete(
+            prompt, max_tokens=max_tokens, estimated_tokens=estimate_tokens(prompt)
+        ),
+        len(texts),
+    )
+    if parsed is not None:
+        return parsed
+    # Each single-text call returns a one-element list
+    return [
+        translation
+        for (translation,) in await asyncio.gather(
+            *(translate_batch(engine, [text], target_lang) for text in texts)
         )
-        try:
-            # Use Responses API for newer models (e.g., gpt-4.1, gpt-4o)
-            if model and (model.startswith("gpt-4.1") or model.startswith("gpt-4o")):
-                response = client.responses.create(
-                    model=model,
-                    input=prompt,
-                    instructions="You are a helpful assistant that translates subtitles.",
-                    temperature=0.3,
-                    max_output_tokens=1024,
-                )
-                # Prefer helper if available
-                try:
-                    return response.output_text.strip()
-                except Exception:
-                    # Fallback parsing if helper is unavailable
-                    try:
-                        segments = []
-                        if hasattr(response, "output") and response.output:
-                            for content_item in response.output[0].content:
-                                text_val = getattr(content_item, "text", None)
-                                if text_val:
-                                    segments.append(text_val)
-                        if segments:
-                            return "\n".join(segments).strip()
-                    except Exception:
-                        pass
-                    return str(response).strip()
-            else:
-                # Backward compatibility: use Chat Completions for older models
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a helpful assistant that translates subtitles.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=0.3,
-                    max_tokens=1024,
-                )
-                return response.choices[0].message.content.strip()
-        except Exception as e:
-            # Last-resort fallback to ensure we return something
-            return str(e)
-    else:
-        return f"Unsupported provider: {router}"
-
-
-def translate_block(args: Tuple[str, str, str, str]) -> str:
-    """Translate a single SRT block."""
-    block, target_lang, model, router = args
-    parsed = parse_srt_block(block)
-    if not parsed:
-        return block
-    index, time, text_lines = parsed
-    text = "\n".join(text_lines)
-    if text.strip():
-        translated_text = translate_text(text, target_lang, model=model, router=router)
+    ]
+
+
+def pack_batches(
+    texts: List[str], batch_size: int, batch_max_tokens: int
+) -> List[List[int]]:
+    """Group text positions into consecutive batches bounded by count and estimated tokens."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (
+            len(current) >= batch_size or current_tokens + tokens > batch_max_tokens
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TranslationProgress(NamedTuple):
+    """Progress of a translation run, reported after every finished request."""
+
+    done: int  # Blocks translated (or needing no request) so far
+    total: int
+    tokens: int  # Input plus output tokens reported by the provider so far
+    elapsed_s: float
+    eta_s: Optional[float]  # None until the first request has finished
+    cached_tokens: int = 0  # Input tokens served from the provider's prompt cache
+
+
+async def translate_blocks(
+    cues: List[Cue],
+    engine: TranslationEngine,
+    target_lang: str,
+    batch_size: int = 1,
+    batch_max_tokens: int = 2000,
+    memory: Optional[TranslationMemory] = None,
+    on_block: Optional[Callable[[int, Cue], None]] = None,
+    on_progress: Optional[Callable[[TranslationProgress], None]] = None,
+    context_cues: int = 0,
+) -> List[Cue]:
+    """
+    Translate cues through ``engine``, batch_size cues per request.
+
+    Texts found in ``memory`` are not sent, and new translations are added to it as each
+    request finishes. With context_cues > 0, each request also carries the source text of
+    up to that many cues before and after its cues as read-only context. Requests complete
+    out of order; ``on_block(position, block)`` is called in block order as soon as every
+    earlier block is done, and ``on_progress`` after each finished request.
+    """
+    started = time.monotonic()
+    finished: List[Optional[Cue]] = [None] * len(cues)
+    # Positions of the cues waiting on each distinct text, so repeats are sent once
+    waiting: Dict[str, List[int]] = {}
+    for i, cue in enumerate(cues):
+        text = cue.text
+        if text.strip():
+            waiting.setdefault(text, []).append(i)
+        else:
+            finished[i] = cues[i]
+
+    def finish(text: str, translated_text: str) -> None:
         translated_text_lines = translated_text.splitlines() or [translated_text]
-    else:
-        translated_text_lines = text_lines
-    translated_block = build_srt_block_from_lines(index, time, translated_text_lines)
-    return translated_block
+        for i in waiting.pop(text):
+            cue = cues[i]
+            finished[i] = Cue(cue.index, cue.start_ms, cue.end_ms, translated_text_lines)
+
+    if memory is not None and waiting:
+        texts = list(waiting)
+        remembered = memory.get_many(texts, target_lang, engine.model, engine.router)
+        for j, translated_text in remembered.items():
+            finish(texts[j], translated_text)
+
+    # Reorder buffer: emit finished cues in order, holding back any that overtook a gap
+    next_position = 0
+
+    def emit_ready() -> None:
+        nonlocal next_position
+        while next_position < len(finished) and finished[next_position] is not None:
+            if on_block is not None:
+                on_block(next_position, finished[next_position])
+            next_position += 1
+
+    initially_done = sum(block is not None for block in finished)
+    done = initially_done
+
+    def report() -> None:
+        if on_progress is None:
+            return
+        elapsed = time.monotonic() - started
+        translated = done - initially_done
+        eta = elapsed / translated * (len(cues) - done) if translated else None
+        on_progress(
+            TranslationProgress(
+                done,
+                len(cues),
+                engine.input_tokens + engine.output_tokens,
+                elapsed,
+                eta,
+                engine.cached_tokens,
+            )
+        )
 
+    emit_ready()
+    report()
+
+    pending_texts = list(waiting)
+    batches = pack_batches(pending_texts, max(1, batch_size), batch_max_tokens)
+    # Position of each pending text's first cue, which its context is taken around
+    first_positions = [waiting[text][0] for text in pending_texts]
+
+    def context_lines(start: int, stop: int) -> List[str]:
+        lines = (" ".join(cue.lines).strip() for cue in cues[max(0, start) : stop])
+        return [line for line in lines if line]
+
+    async def run(batch: List[int]) -> Tuple[List[str], List[str]]:
+        batch_texts = [pending_texts[k] for k in batch]
+        context = None
+        if context_cues > 0:
+            first, last = first_positions[batch[0]], first_positions[batch[-1]]
+            context = (
+                context_lines(first - context_cues, first),
+                context_lines(last + 1, last + 1 + context_cues),
+            )
+        return batch_texts, await translate_batch(engine, batch_texts, target_lang, context)
 
-def translate_srt(
-    input_path: str,
-    output_path: str,
+    tasks = [asyncio.ensure_future(run(batch)) for batch in batches]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            batch_texts, translations = await next_done
+            if memory is not None:
+                memory.put_many(
+                    zip(batch_texts, translations), target_lang, engine.model, engine.router
+                )
+            for text, translated_text in zip(batch_texts, translations):
+                done += len(waiting[text])
+                finish(text, translated_text)
+            emit_ready()
+            report()
+    finally:
+        for task in tasks:
+            task.cancel()
+    return finished
+
+
+async def _translate_blocks_with_engine(
+    cues: List[Cue],
     target_lang: str,
-    model: Optional[str] = None,
-    workers: int = 15,
-    router: str = "dashscope",
-    max_chars: int = 125,
-) -> str:
-    """Translate SRT file using specified provider with resegmentation."""
+    model: str,
+    router: str,
+    workers: int,
+    batch_size: int,
+    batch_max_tokens: int,
+    memory: Optional[TranslationMemory],
+    on_block: Optional[Callable[[int, Cue], None]],
+    on_progress: Optional[Callable[[TranslationProgress], None]],
+    context_cues: int = 0,
+) -> List[Cue]:
+    async with TranslationEngine(
+        router, model, SYSTEM_PROMPT, max_concurrency=workers
+    ) as engine:
+        return await translate_blocks(
+            cues,
+            engine,
+            target_lang,
+            batch_size,
+            batch_max_tokens,
+            memory,
+            on_block,
+            on_progress,
+            context_cues,
+        )
+
+
+def resolve_translation_model(router: str, model: Optional[str] = None) -> str:
+    """Check that the provider's API key is set and return the model to use for it."""
     # Check API keys based on router
     if router == "openai":
         api_key = os.getenv("OPENAI_API_KEY")
@@ -350,20 +742,105 @@ def translate_srt(
         raise RuntimeError(
             f"Error: Unknown provider '{router}'. Expected one of: openai, openrouter, dashscope."
         )
+    return model
+
+
+def translate_cues(
+    cues: List[Cue],
+    target_lang: str,
+    model: Optional[str] = None,
+    workers: int = 15,
+    router: str = "dashscope",
+    batch_size: int = 1,
+    batch_max_tokens: int = 2000,
+    use_memory: bool = True,
+    on_block: Optional[Callable[[int, Cue], None]] = None,
+    progress_callback: Optional[Callable[[TranslationProgress], None]] = None,
+    context_cues: int = 0,
+) -> List[Cue]:
+    """Translate cues in memory; see translate_srt for the options."""
+    model = resolve_translation_model(router, model)
+    return asyncio.run(
+        _translate_blocks_with_engine(
+            cues,
+            target_lang,
+            model,
+            router,
+            workers,
+            batch_size,
+            batch_max_tokens,
+            get_translation_memory() if use_memory else None,
+            on_block,
+            progress_callback,
+            context_cues,
+        )
+    )
+
+
+def _block_writer(output_file) -> Callable[[int, Cue], None]:
+    """on_block callback appending each cue to output_file as an SRT block."""
+
+    def write_block(position: int, cue: Cue) -> None:
+        text = cue.to_srt()
+        output_file.write(text if position == 0 else "\n\n" + text)
+        output_file.flush()
+
+    return write_block
+
+
+def translate_srt(
+    input_path: str,
+    output_path: str,
+    target_lang: str,
+    model: Optional[str] = None,
+    workers: int = 15,
+    router: str = "dashscope",
+    max_chars: int = 125,
+    batch_size: int = 1,
+    batch_max_tokens: int = 2000,
+    use_memory: bool = True,
+    progress_callback: Optional[Callable[[TranslationProgress], None]] = None,
+    issues: Optional[List[ParseIssue]] = None,
+    limits: Optional[SegmentLimits] = None,
+    context_cues: int = 0,
+) -> str:
+    """
+    Translate SRT file using specified provider with resegmentation.
+    Requests go through the async TranslationEngine: concurrency adapts to the
+    provider up to ``workers`` requests in flight, and rate limits are retried.
+    With batch_size > 1, up to batch_size blocks (and batch_max_tokens estimated
+    tokens) are translated per request instead of one request per block.
+    With use_memory, texts already in the translation memory are not sent again.
+    Blocks are written to output_path in order as they are translated, and
+    progress_callback receives a TranslationProgress after every request, and
+    cues the parser skipped or repaired are appended to issues. Resegmentation
+    respects max_chars and the optional SegmentLimits. With context_cues > 0, the
+    source text of that many neighbouring cues on each side is sent along with every
+    request as read-only context.
+    """
+    model = resolve_translation_model(router, model)
 
     # First resegment the SRT to get optimal chunks for translation
-    srt_content = read_srt(input_path)
-    parsed_blocks = parse_srt_blocks(srt_content)
-    resegmented_blocks = resegment_blocks(parsed_blocks, max_chars)
-
-    # Now translate the resegmented blocks
-    block_args = [(block, target_lang, model, router) for block in resegmented_blocks]
-    translated_blocks = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-        for translated_block in executor.map(translate_block, block_args):
-            translated_blocks.append(translated_block)
-    translated_content = "\n\n".join(translated_blocks)
-    write_srt(output_path, translated_content)
+    resegmented_cues = resegment_cues(
+        read_srt_cues(input_path, issues), max_chars, limits
+    )
+
+    # Now translate the resegmented cues, appending each to the output once its
+    # predecessors are written so an interrupted run keeps everything before the gap
+    with open(output_path, "w", encoding="utf-8") as output_file:
+        translate_cues(
+            resegmented_cues,
+            target_lang,
+            model,
+            workers,
+            router,
+            batch_size,
+            batch_max_tokens,
+            use_memory,
+            _block_writer(output_file),
+            progress_callback,
+            context_cues,
+        )
     return output_path
 
 
@@ -372,109 +849,192 @@ def translate_srt(
 # ============================================================================
 
 
-def resegment_blocks(
-    parsed_blocks: List[Tuple[str, str, List[str]]], max_chars: int
-) -> List[str]:
-    """Resegment SRT blocks based on character limit."""
-    output_blocks: List[str] = []
+def resegment_timings(
+    cues: Iterable[Cue], max_chars: int, limits: Optional[SegmentLimits] = None
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Resegment cues based on character limit and optional token, duration and reading
+    speed ``limits``, returning the segment texts with their start and end times as
+    int64 millisecond arrays.
 
-    current_index = 1
-    group_start_time: str = ""
-    group_end_time: str = ""
+    Cues are merged and split in one pass over precomputed character counts; the
+    proportional timings of split cues are then computed for all of them at once.
+    """
+    texts: List[str] = []
+    starts: List[int] = []
+    ends: List[int] = []
+
+    # Chunks of overlong cues: output position and length of each chunk, plus the
+    # start, duration and first chunk of every split cue
+    chunk_positions: List[int] = []
+    chunk_chars: List[int] = []
+    split_starts: List[int] = []
+    split_durations: List[int] = []
+    split_offsets: List[int] = []
+
+    group_start_ms = 0
+    group_end_ms = 0
     group_text_parts: List[str] = []
     group_char_count = 0
+    group_tokens = 0
+
+    limits = limits or SegmentLimits()
+    max_tokens, max_duration_ms, max_chars_per_second, count_tokens = limits
 
     def flush_group():
-        nonlocal current_index, group_start_time, group_end_time, group_text_parts, group_char_count
+        nonlocal group_text_parts, group_char_count, group_tokens
         if group_char_count > 0 and group_text_parts:
-            block_text = normalize_whitespace(" ".join(group_text_parts))
-            output_blocks.append(
-                build_srt_block(
-                    current_index, group_start_time, group_end_time, block_text
-                )
-            )
-            current_index += 1
-            group_start_time = ""
-            group_end_time = ""
+            # Parts are already normalized, so joining them keeps the text normalized
+            texts.append(join_cue_texts(group_text_parts))
+            starts.append(group_start_ms)
+            ends.append(group_end_ms)
             group_text_parts = []
             group_char_count = 0
+            group_tokens = 0
 
-    for _, time_line, text_lines in parsed_blocks:
-        start_time_str, end_time_str = extract_times(time_line)
-        start_ms = time_str_to_ms(start_time_str)
-        end_ms = time_str_to_ms(end_time_str)
-        duration_ms = max(0, end_ms - start_ms)
-
-        text = normalize_whitespace(" ".join(text_lines))
+    for cue in cues:
+        text = normalize_whitespace(" ".join(cue.lines))
         if not text:
             continue
 
         this_count = count_chars(text)
-
-        # If adding this block would exceed the limit, flush the current group first
-        if group_char_count > 0 and (group_char_count + this_count) > max_chars:
+        this_tokens = count_tokens(text) if max_tokens else 0
+
+        # If adding this block would exceed a limit, flush the current group first
+        if group_char_count > 0 and (
+            (group_char_count + this_count) > max_chars
+            or (max_tokens and group_tokens + this_tokens > max_tokens)
+            or (max_duration_ms and cue.end_ms - group_start_ms > max_duration_ms)
+            or (
+                max_chars_per_second
+                and (group_char_count + this_count) * 1000
+                > max_chars_per_second * (cue.end_ms - group_start_ms)
+            )
+        ):
             flush_group()
 
-        # If the single block itself exceeds max_chars, split it internally
-        if this_count > max_chars:
+        # If the single block itself exceeds a limit, split it internally
+        char_limit = max_chars
+        if max_tokens or max_duration_ms:
+            char_limit = split_char_limit(
+                text, this_tokens, cue.end_ms - cue.start_ms, max_chars, limits
+            )
+        if this_count > char_limit:
             # Ensure any pending group is flushed before inserting split pieces
             flush_group()
             sub_texts = split_text_into_chunks_by_chars_with_punctuation(
-                text, max_chars
+                text, char_limit
             )
-            # Distribute timings proportionally by character count
-            total_chars = sum(count_chars(st) for st in sub_texts) or 1
-            accumulated_ms = 0
-            for idx, st in enumerate(sub_texts):
-                chars_in_chunk = count_chars(st) or 1
-                # compute chunk duration (last chunk takes remaining to avoid rounding drift)
-                if idx < len(sub_texts) - 1:
-                    chunk_ms = int(duration_ms * (chars_in_chunk / total_chars))
-                else:
-                    chunk_ms = max(0, duration_ms - accumulated_ms)
-                chunk_start_ms = start_ms + accumulated_ms
-                chunk_end_ms = chunk_start_ms + chunk_ms
-                accumulated_ms += chunk_ms
-
-                output_blocks.append(
-                    build_srt_block(
-                        current_index,
-                        ms_to_time_str(chunk_start_ms),
-                        ms_to_time_str(chunk_end_ms),
-                        st,
-                    )
-                )
-                current_index += 1
+            if not sub_texts:
+                continue
+            split_starts.append(cue.start_ms)
+            split_durations.append(max(0, cue.end_ms - cue.start_ms))
+            split_offsets.append(len(chunk_chars))
+            for st in sub_texts:
+                chunk_positions.append(len(texts))
+                chunk_chars.append(count_chars(st))
+                texts.append(st)
+                starts.append(0)
+                ends.append(0)
             # Done with this overlong block
             continue
 
         # Otherwise, safe to merge this whole block into the group
         if group_char_count == 0:
-            group_start_time = start_time_str
+            group_start_ms = cue.start_ms
         group_text_parts.append(text)
-        group_end_time = end_time_str
+        group_end_ms = cue.end_ms
         group_char_count += this_count
+        group_tokens += this_tokens
 
         # Prefer flushing on punctuation at the end of this block
         if ends_with_preferred_punctuation(text):
             flush_group()
-        elif group_char_count >= max_chars:
+        elif (
+            group_char_count >= max_chars
+            or (max_tokens and group_tokens >= max_tokens)
+            or (max_duration_ms and group_end_ms - group_start_ms >= max_duration_ms)
+        ):
             flush_group()
 
     # Flush any remaining group
-    if group_char_count > 0:
-        flush_group()
+    flush_group()
+
+    start_ms = np.array(starts, dtype=np.int64)
+    end_ms = np.array(ends, dtype=np.int64)
+    if chunk_chars:
+        start_ms[chunk_positions], end_ms[chunk_positions] = _split_timings(
+            np.array(chunk_chars, dtype=np.int64),
+            np.array(split_offsets, dtype=np.int64),
+            np.array(split_starts, dtype=np.int64),
+            np.array(split_durations, dtype=np.int64),
+        )
+    return texts, start_ms, end_ms
 
-    return output_blocks
 
+def _split_timings(
+    chars: np.ndarray, offsets: np.ndarray, starts: np.ndarray, durations: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distribute each split cue's duration over its chunks proportionally to their
+    character counts; chunks of cue ``k`` are ``chars[offsets[k]:offsets[k + 1]]``.
 
-def resegment_srt(input_path: str, output_path: str, max_chars: int = 125) -> str:
-    """Resegment SRT file based on character limit."""
-    srt_content = read_srt(input_path)
-    parsed = parse_srt_blocks(srt_content)
-    merged_blocks = resegment_blocks(parsed, max_chars=max_chars)
-    output_content = "\n\n".join(merged_blocks) + "\n"
-    write_srt(output_path, output_content)
+    Every chunk but the last gets int(duration * (chars / total)) and the last takes
+    the remainder to avoid rounding drift, exactly as a per-chunk loop would.
+    """
+    sizes = np.diff(np.append(offsets, len(chars)))
+    parent = np.repeat(np.arange(len(offsets)), sizes)
+    last = offsets + sizes - 1
+
+    totals = np.maximum(np.add.reduceat(chars, offsets), 1)
+    chars = np.maximum(chars, 1)
+    chunk_ms = (durations[parent] * (chars / totals[parent])).astype(np.int64)
+    chunk_ms[last] = 0
+    chunk_ms[last] = np.maximum(0, durations - np.add.reduceat(chunk_ms, offsets))
+
+    # Start of each chunk: its cue's start plus the durations of the chunks before it
+    before = np.cumsum(chunk_ms) - chunk_ms
+    chunk_starts = starts[parent] + before - before[offsets][parent]
+    return chunk_starts, chunk_starts + chunk_ms
+
+
+def resegment_cues(
+    cues: Iterable[Cue], max_chars: int, limits: Optional[SegmentLimits] = None
+) -> List[Cue]:
+    """Resegment cues based on character limit and optional SegmentLimits."""
+    texts, start_ms, end_ms = resegment_timings(cues, max_chars, limits)
+    return [
+        Cue(index, start, end, [text])
+        for index, (text, start, end) in enumerate(
+            zip(texts, start_ms.tolist(), end_ms.tolist()), 1
+        )
+    ]
+
+
+def resegment_blocks(
+    cues: Iterable[Cue], max_chars: int, limits: Optional[SegmentLimits] = None
+) -> List[str]:
+    """Resegment cues based on character limit, returning formatted SRT blocks."""
+    texts, start_ms, end_ms = resegment_timings(cues, max_chars, limits)
+    return [
+        f"{index}\n{time_line}\n{text}"
+        for index, (time_line, text) in enumerate(
+            zip(format_time_lines(start_ms, end_ms), texts), 1
+        )
+    ]
+
+
+def resegment_srt(
+    input_path: str,
+    output_path: str,
+    max_chars: int = 125,
+    issues: Optional[List[ParseIssue]] = None,
+    limits: Optional[SegmentLimits] = None,
+) -> str:
+    """Resegment SRT file based on character limit and optional SegmentLimits."""
+    parsed = read_srt_cues(input_path, issues)
+    merged_blocks = resegment_cues(parsed, max_chars=max_chars, limits=limits)
+    write_srt(output_path, format_srt_cues(merged_blocks) + "\n")
     return output_path
 
 
@@ -483,6 +1043,92 @@ def resegment_srt(input_path: str, output_path: str, max_chars: int = 125) -> st
 # ============================================================================
 
 
+def process_cues(
+    cues: Iterable[Cue],
+    operation: str = "resegment",
+    max_chars: int = 125,
+    target_lang: Optional[str] = None,
+    model: Optional[str] = None,
+    workers: int = 15,
+    router: str = "dashscope",
+    batch_size: int = 1,
+    batch_max_tokens: int = 2000,
+    use_memory: bool = True,
+    progress_callback: Optional[Callable[[TranslationProgress], None]] = None,
+    limits: Optional[SegmentLimits] = None,
+    context_cues: int = 0,
+) -> str:
+    """
+    Process parsed cues in memory with specified operation and return SRT content.
+
+    Every step works on the cues and the result is serialized once; see
+    process_srt_file for the arguments.
+    """
+    if operation not in ("resegment", "translate", "both"):
+        raise ValueError(
+            f"Unknown operation: {operation}. Must be 'resegment', 'translate', or 'both'"
+        )
+    if operation != "resegment" and not target_lang:
+        raise ValueError("target_lang is required for translation")
+
+    # Translation always starts from resegmented blocks for optimal chunk sizes
+    cues = resegment_cues(cues, max_chars, limits)
+    if operation == "resegment":
+        return format_srt_cues(cues) + "\n"
+
+    cues = translate_cues(
+        cues,
+        target_lang,
+        model,
+        workers,
+        router,
+        batch_size,
+        batch_max_tokens,
+        use_memory,
+        progress_callback=progress_callback,
+        context_cues=context_cues,
+    )
+    if operation == "translate":
+        return format_srt_cues(cues)
+
+    # "both": resegment the translated text again for the target language
+    return format_srt_cues(resegment_cues(cues, max_chars, limits)) + "\n"
+
+
+def process_srt_content(
+    srt_content: str,
+    operation: str = "resegment",
+    max_chars: int = 125,
+    target_lang: Optional[str] = None,
+    model: Optional[str] = None,
+    workers: int = 15,
+    router: str = "dashscope",
+    batch_size: int = 1,
+    batch_max_tokens: int = 2000,
+    use_memory: bool = True,
+    progress_callback: Optional[Callable[[TranslationProgress], None]] = None,
+    issues: Optional[List[ParseIssue]] = None,
+    limits: Optional[SegmentLimits] = None,
+    context_cues: int = 0,
+) -> str:
+    """Process SRT content in memory with specified operation and return the result."""
+    return process_cues(
+        parse_srt_blocks(srt_content, issues),
+        operation,
+        max_chars,
+        target_lang,
+        model,
+        workers,
+        router,
+        batch_size,
+        batch_max_tokens,
+        use_memory,
+        progress_callback,
+        limits,
+        context_cues,
+    )
+
+
 def process_srt_file(
     input_path: str,
     output_path: str,
@@ -492,6 +1138,13 @@ def process_srt_file(
     model: Optional[str] = None,
     workers: int = 15,
     router: str = "dashscope",
+    batch_size: int = 1,
+    batch_max_tokens: int = 2000,
+    use_memory: bool = True,
+    progress_callback: Optional[Callable[[TranslationProgress], None]] = None,
+    issues: Optional[List[ParseIssue]] = None,
+    limits: Optional[SegmentLimits] = None,
+    context_cues: int = 0,
 ) -> str:
     """
     Process SRT file with specified operation.
@@ -503,38 +1156,395 @@ def process_srt_file(
         max_chars: Maximum characters per segment (for resegmentation)
         target_lang: Target language code (for translation)
         model: Model to use for translation
-        workers: Number of concurrent workers for translation
+        workers: Maximum concurrent translation requests (concurrency adapts below it)
         router: Translation provider ("dashscope", "openai", "openrouter")
+        batch_size: Maximum SRT blocks translated per request (1 = one request per block)
+        batch_max_tokens: Maximum estimated input tokens per batched request
+        use_memory: Reuse and record translations in the translation memory
+        progress_callback: Receives a TranslationProgress after every translation request
+        issues: Collects the cues the parser skipped or repaired, with line numbers
+        limits: Token, duration and reading speed limits for resegmentation
+        context_cues: Neighbouring cues on each side sent as read-only context per request
 
     Returns:
         Path to output file
     """
-    if operation == "resegment":
-        return resegment_srt(input_path, output_path, max_chars)
-    elif operation == "translate":
+    if operation == "translate":
         if not target_lang:
             raise ValueError("target_lang is required for translation")
+        # Streams blocks to output_path as they are translated
         return translate_srt(
-            input_path, output_path, target_lang, model, workers, router, max_chars
+            input_path,
+            output_path,
+            target_lang,
+            model,
+            workers,
+            router,
+            max_chars,
+            batch_size,
+            batch_max_tokens,
+            use_memory,
+            progress_callback,
+            issues,
+            limits,
+            context_cues,
         )
-    elif operation == "both":
+    result = process_cues(
+        read_srt_cues(input_path, issues),
+        operation,
+        max_chars,
+        target_lang,
+        model,
+        workers,
+        router,
+        batch_size,
+        batch_max_tokens,
+        use_memory,
+        progress_callback,
+        limits,
+        context_cues,
+    )
+    write_srt(output_path, result)
+    return output_path
+
+
+# ============================================================================
+# Corpus Processing
+# ============================================================================
+
+# Records, per output file, the input and settings it was produced from
+CORPUS_MANIFEST_NAME = ".srt_processor_manifest.json"
+
+
+class CorpusSummary(NamedTuple):
+    """Outcome of a process_srt_corpus run."""
+
+    processed: List[str]  # Output paths written
+    skipped: List[str]  # Output paths already up to date
+    failed: Dict[str, str]  # Input path -> error message
+    cues: int  # Cues resegmented and, when translating, sent for translation
+    requests: int  # Completed translation requests
+    retries: int  # Failed attempts that were retried (throttling, transient errors)
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int  # Input tokens served from the provider's prompt cache
+    elapsed_s: float
+
+
+def find_srt_files(
+    source: str, exclude_dir: Optional[str] = None
+) -> Tuple[str, List[str]]:
+    """
+    Return (root, input paths) for a directory, searched recursively for .srt files, or
+    a glob pattern. Output paths mirror each input's path relative to root. Files under
+    ``exclude_dir`` (the output directory) are left out, so outputs written inside the
+    source are never picked up as inputs by a later run.
+    """
+    if os.path.isdir(source):
+        pattern = os.path.join(glob.escape(source), "**", "*.srt")
+        root = os.path.abspath(source)
+        paths = glob.glob(pattern, recursive=True)
+    else:
+        root = None
+        paths = [p for p in glob.glob(source, recursive=True) if os.path.isfile(p)]
+    if exclude_dir is not None:
+        excluded = os.path.join(os.path.realpath(exclude_dir), "")
+        paths = [p for p in paths if not os.path.realpath(p).startswith(excluded)]
+    paths.sort()
+    if root is None:
+        if not paths:
+            return os.path.abspath("."), []
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    return root, paths
+
+
+def _load_corpus_manifest(output_dir: str) -> Dict[str, dict]:
+    try:
+        with open(os.path.join(output_dir, CORPUS_MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_corpus_manifest(output_dir: str, manifest: Dict[str, dict]) -> None:
+    path = os.path.join(output_dir, CORPUS_MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _input_fingerprint(input_path: str) -> dict:
+    stat = os.stat(input_path)
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": file_sha256(input_path),
+    }
+
+
+def _is_up_to_date(
+    input_path: str, output_path: str, entry: Optional[dict], settings: dict
+) -> bool:
+    """
+    True if output_path was produced from this input (unchanged mtime and size, or else
+    the same SHA-256) with the same settings. A touched but unchanged input has its new
+    mtime recorded in ``entry``, so it is not hashed again next time.
+    """
+    if entry is None or entry.get("settings") != settings or not os.path.exists(output_path):
+        return False
+    stat = os.stat(input_path)
+    if (stat.st_mtime_ns, stat.st_size) == (entry.get("mtime_ns"), entry.get("size")):
+        return True
+    # Touched but possibly unchanged: fall back to comparing contents
+    if file_sha256(input_path) != entry.get("sha256"):
+        return False
+    entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    return True
+
+
+# Corpus files translated at once. Each keeps its output open while it runs, so this
+# bounds open file descriptors; it is well above any useful concurrency limit, so the
+# shared engine stays saturated
+CORPUS_MAX_OPEN_FILES = 64
+
+
+async def _translate_corpus(
+    jobs: List[Tuple[str, List[Cue]]],
+    operation: str,
+    max_chars: int,
+    target_lang: str,
+    model: str,
+    router: str,
+    workers: int,
+    batch_size: int,
+    batch_max_tokens: int,
+    memory: Optional[TranslationMemory],
+    progress_callback: Optional[Callable[[TranslationProgress], None]],
+    limits: Optional[SegmentLimits],
+    context_cues: int,
+) -> Tuple[List[Optional[BaseException]], Dict[str, float]]:
+    """
+    Translate the resegmented cues of every (output path, cues) job through one engine.
+
+    Returns each job's exception (None on success) and the engine's stats.
+    """
+    started = time.monotonic()
+    total = sum(len(cues) for _, cues in jobs)
+    # Per file: cues done, and cues done before any request (memory hits, blank cues)
+    done = [0] * len(jobs)
+    initially_done: List[Optional[int]] = [None] * len(jobs)
+
+    async with TranslationEngine(
+        router, model, SYSTEM_PROMPT, max_concurrency=workers
+    ) as engine:
+
+        def on_progress(k: int, progress: TranslationProgress) -> None:
+            done[k] = progress.done
+            if initially_done[k] is None:
+                initially_done[k] = progress.done
+            if progress_callback is None:
+                return
+            elapsed = time.monotonic() - started
+            all_done = sum(done)
+            translated = all_done - sum(n or 0 for n in initially_done)
+            eta = elapsed / translated * (total - all_done) if translated else None
+            progress_callback(
+                TranslationProgress(
+                    all_done,
+                    total,
+                    engine.input_tokens + engine.output_tokens,
+                    elapsed,
+                    eta,
+                    engine.cached_tokens,
+                )
+            )
+
+        open_files = asyncio.Semaphore(CORPUS_MAX_OPEN_FILES)
+
+        async def run(k: int, output_path: str, cues: List[Cue]) -> None:
+            async with open_files:
+                await translate_file(k, output_path, cues)
+
+        async def translate_file(k: int, output_path: str, cues: List[Cue]) -> None:
+            report = functools.partial(on_progress, k)
+            if operation == "translate":
+                # Streamed in order, like translate_srt
+                with open(output_path, "w", encoding="utf-8") as output_file:
+                    await translate_blocks(
+                        cues,
+                        engine,
+                        target_lang,
+                        batch_size,
+                        batch_max_tokens,
+                        memory,
+                        _block_writer(output_file),
+                        report,
+                        context_cues,
+                    )
+            else:
+                translated = await translate_blocks(
+                    cues,
+                    engine,
+                    target_lang,
+                    batch_size,
+                    batch_max_tokens,
+                    memory,
+                    None,
+                    report,
+                    context_cues,
+                )
+                write_srt(
+                    output_path,
+                    format_srt_cues(resegment_cues(translated, max_chars, limits)) + "\n",
+                )
+
+        # Up to CORPUS_MAX_OPEN_FILES files have their requests queued at once; the engine's
+        # concurrency limit and the provider's rate limiter pace them, roughly in file order
+        errors = await asyncio.gather(
+            *(run(k, output_path, cues) for k, (output_path, cues) in enumerate(jobs)),
+            return_exceptions=True,
+        )
+        return errors, engine.stats()
+
+
+def process_srt_corpus(
+    source: str,
+    output_dir: str,
+    operation: str = "resegment",
+    max_chars: int = 125,
+    target_lang: Optional[str] = None,
+    model: Optional[str] = None,
+    workers: int = 15,
+    router: str = "dashscope",
+    batch_size: int = 1,
+    batch_max_tokens: int = 2000,
+    use_memory: bool = True,
+    force: bool = False,
+    progress_callback: Optional[Callable[[TranslationProgress], None]] = None,
+    issues: Optional[Dict[str, List[ParseIssue]]] = None,
+    limits: Optional[SegmentLimits] = None,
+    context_cues: int = 0,
+) -> CorpusSummary:
+    """
+    Process every SRT file of a directory or glob pattern into output_dir.
+
+    Outputs mirror the inputs' paths relative to the source root. All files' requests
+    go through one TranslationEngine, so they share one connection pool, one adaptive
+    concurrency limit of up to ``workers`` requests in flight and the provider's rate
+    limiter. Outputs that output_dir's manifest records as produced from the same input
+    with the same settings are skipped unless ``force``. progress_callback receives the
+    progress of the whole corpus, and issues collects parse issues per input path; see
+    process_srt_file for the other arguments.
+    """
+    if operation not in ("resegment", "translate", "both"):
+        raise ValueError(
+            f"Unknown operation: {operation}. Must be 'resegment', 'translate', or 'both'"
+        )
+    settings = {"operation": operation, "max_chars": max_chars}
+    if limits is not None:
+        settings["limits"] = {
+            **limits._asdict(),
+            "count_tokens": getattr(
+                limits.count_tokens, "__qualname__", repr(limits.count_tokens)
+            ),
+        }
+    if operation != "resegment":
         if not target_lang:
             raise ValueError("target_lang is required for translation")
-        # First translate (which now includes resegmentation), then resegment again
-        temp_path = output_path + ".temp"
-        translate_srt(
-            input_path, temp_path, target_lang, model, workers, router, max_chars
+        model = resolve_translation_model(router, model)
+        settings.update(
+            target_lang=target_lang,
+            model=model,
+            router=router,
+            batch_size=batch_size,
+            batch_max_tokens=batch_max_tokens,
         )
-        result = resegment_srt(temp_path, output_path, max_chars)
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        return result
+        if context_cues > 0:
+            settings["context_cues"] = context_cues
+
+    started = time.monotonic()
+    root, inputs = find_srt_files(source, exclude_dir=output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_corpus_manifest(output_dir)
+
+    skipped: List[str] = []
+    failed: Dict[str, str] = {}
+    # (input path, manifest key, output path, input fingerprint, resegmented cues)
+    jobs: List[Tuple[str, str, str, dict, List[Cue]]] = []
+    for input_path in inputs:
+        relative = os.path.relpath(os.path.abspath(input_path), root)
+        output_path = os.path.join(output_dir, relative)
+        if not force and _is_up_to_date(
+            input_path, output_path, manifest.get(relative), settings
+        ):
+            skipped.append(output_path)
+            continue
+        file_issues: List[ParseIssue] = []
+        try:
+            # Fingerprint before reading, so an edit during the run is picked up next time
+            fingerprint = _input_fingerprint(input_path)
+            cues = resegment_cues(
+                read_srt_cues(input_path, file_issues), max_chars, limits
+            )
+        except (OSError, UnicodeDecodeError) as e:
+            failed[input_path] = str(e)
+            continue
+        if issues is not None and file_issues:
+            issues[input_path] = file_issues
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        jobs.append((input_path, relative, output_path, fingerprint, cues))
+
+    stats: Dict[str, float] = {}
+    if operation == "resegment":
+        errors: List[Optional[BaseException]] = []
+        for _, _, output_path, _, cues in jobs:
+            try:
+                write_srt(output_path, format_srt_cues(cues) + "\n")
+                errors.append(None)
+            except OSError as e:
+                errors.append(e)
     else:
-        raise ValueError(
-            f"Unknown operation: {operation}. Must be 'resegment', 'translate', or 'both'"
+        errors, stats = asyncio.run(
+            _translate_corpus(
+                [(output_path, cues) for _, _, output_path, _, cues in jobs],
+                operation,
+                max_chars,
+                target_lang,
+                model,
+                router,
+                workers,
+                batch_size,
+                batch_max_tokens,
+                get_translation_memory() if use_memory else None,
+                progress_callback,
+                limits,
+                context_cues,
+            )
         )
 
+    processed: List[str] = []
+    for (input_path, relative, output_path, fingerprint, _), error in zip(jobs, errors):
+        if error is not None:
+            failed[input_path] = str(error) or type(error).__name__
+            manifest.pop(relative, None)
+        else:
+            processed.append(output_path)
+            manifest[relative] = {**fingerprint, "settings": settings}
+    _save_corpus_manifest(output_dir, manifest)
+
+    return CorpusSummary(
+        processed,
+        skipped,
+        failed,
+        sum(len(cues) for *_, cues in jobs),
+        stats.get("requests", 0),
+        stats.get("retries", 0),
+        stats.get("input_tokens", 0),
+        stats.get("output_tokens", 0),
+        stats.get("cached_tokens", 0),
+        time.monotonic() - started,
+    )
+
 
 # ============================================================================
 # CLI Interface (for backward compatibility)
@@ -546,8 +1556,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Unified SRT processing tool for resegmentation and translation. Translation automatically includes resegmentation for optimal chunk sizes."
     )
-    parser.add_argument("input", help="Input SRT file path")
-    parser.add_argument("output", help="Output SRT file path")
+    parser.add_argument(
+        "input",
+        help="Input SRT file path, or a directory or glob pattern to process a whole corpus",
+    )
+    parser.add_argument(
+        "output", help="Output SRT file path (output directory for a corpus)"
+    )
     parser.add_argument(
         "--operation",
         choices=["resegment", "translate", "both"],
@@ -561,6 +1576,25 @@ if __name__ == "__main__":
         default=125,
         help="Maximum characters per segment (default: 125)",
     )
+    parser.add_argument(
+        "--max-tokens",
+        dest="max_tokens",
+        type=int,
+        help="Maximum estimated tokens per segment (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-duration",
+        dest="max_duration",
+        type=float,
+        help="Maximum seconds per segment (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-cps",
+        dest="max_cps",
+        type=float,
+        help="Maximum reading speed of merged segments in characters per second "
+        "(default: no limit)",
+    )
     parser.add_argument(
         "--target-lang", help="Target language code (e.g., fr, es, de, zh)"
     )
@@ -571,7 +1605,7 @@ if __name__ == "__main__":
         "--workers",
         type=int,
         default=15,
-        help="Number of concurrent workers for translation (default: 15)",
+        help="Maximum concurrent translation requests; the engine adapts below it (default: 15)",
     )
     parser.add_argument(
         "--provider",
@@ -579,9 +1613,121 @@ if __name__ == "__main__":
         default="dashscope",
         help="Translation provider (default: dashscope)",
     )
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=1,
+        help="Maximum subtitle blocks translated per request (default: 1)",
+    )
+    parser.add_argument(
+        "--batch-max-tokens",
+        dest="batch_max_tokens",
+        type=int,
+        default=2000,
+        help="Maximum estimated input tokens per batched request (default: 2000)",
+    )
+    parser.add_argument(
+        "--context",
+        dest="context_cues",
+        type=int,
+        default=0,
+        help="Neighbouring cues on each side sent with every request as read-only "
+        "context (default: 0)",
+    )
+    parser.add_argument(
+        "--no-memory",
+        dest="use_memory",
+        action="store_false",
+        help="Do not reuse or record translations in the translation memory",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Corpus mode: reprocess files whose outputs are already up to date",
+    )
 
     args = parser.parse_args()
 
+    limits = None
+    if args.max_tokens or args.max_duration or args.max_cps:
+        limits = SegmentLimits(
+            max_tokens=args.max_tokens,
+            max_duration_ms=int(args.max_duration * 1000) if args.max_duration else None,
+            max_chars_per_second=args.max_cps,
+        )
+
+    def print_progress(progress: TranslationProgress) -> None:
+        eta = f"{progress.eta_s:.0f}s" if progress.eta_s is not None else "?"
+        cached = f" ({progress.cached_tokens} cached)" if progress.cached_tokens else ""
+        print(
+            f"\rTranslated {progress.done}/{progress.total} blocks, "
+            f"{progress.tokens} tokens{cached}, ETA {eta}   ",
+            end="" if progress.done < progress.total else "\n",
+            flush=True,
+        )
+
+    def print_memory_stats() -> None:
+        if args.operation != "resegment" and args.use_memory:
+            stats = get_translation_memory().stats()
+            print(
+                f"Translation memory: {stats['hits']} hit(s), {stats['misses']} miss(es) "
+                f"({stats['hit_ratio']:.0%} hit ratio), {stats['entries']} entries"
+            )
+
+    if os.path.isdir(args.input) or glob.has_magic(args.input):
+        corpus_issues: Dict[str, List[ParseIssue]] = {}
+        try:
+            summary = process_srt_corpus(
+                args.input,
+                args.output,
+                operation=args.operation,
+                max_chars=args.max_chars,
+                target_lang=args.target_lang,
+                model=args.model,
+                workers=args.workers,
+                router=args.provider,
+                batch_size=args.batch_size,
+                batch_max_tokens=args.batch_max_tokens,
+                use_memory=args.use_memory,
+                force=args.force,
+                progress_callback=print_progress,
+                issues=corpus_issues,
+                limits=limits,
+                context_cues=args.context_cues,
+            )
+        except Exception as e:
+            print(f"Error: {e}")
+            exit(1)
+        for path, file_issues in corpus_issues.items():
+            for issue in file_issues:
+                print(f"Warning: {path}:{issue.line}: {issue.message}")
+        for path, error in summary.failed.items():
+            print(f"Error: {path}: {error}")
+        elapsed = max(summary.elapsed_s, 1e-9)
+        tokens = summary.input_tokens + summary.output_tokens
+        print(
+            f"Processed {len(summary.processed)} file(s), skipped {len(summary.skipped)} "
+            f"up to date, {len(summary.failed)} failed in {summary.elapsed_s:.1f}s: "
+            f"{summary.cues} cues ({summary.cues / elapsed:.0f}/s)"
+        )
+        if args.operation != "resegment":
+            print(
+                f"{summary.requests} request(s) ({summary.requests / elapsed:.1f}/s, "
+                f"{summary.retries} retried), "
+                f"{summary.input_tokens} input + {summary.output_tokens} output tokens "
+                f"({tokens / elapsed:.0f} tokens/s)"
+            )
+            if summary.input_tokens:
+                print(
+                    f"{summary.cached_tokens} input tokens "
+                    f"({summary.cached_tokens / summary.input_tokens:.0%}) "
+                    "served from the provider's prompt cache"
+                )
+        print_memory_stats()
+        exit(1 if summary.failed else 0)
+
+    issues: List[ParseIssue] = []
     try:
         result = process_srt_file(
             args.input,
@@ -592,8 +1738,18 @@ if __name__ == "__main__":
             model=args.model,
             workers=args.workers,
             router=args.provider,
+            batch_size=args.batch_size,
+            batch_max_tokens=args.batch_max_tokens,
+            use_memory=args.use_memory,
+            progress_callback=print_progress,
+            issues=issues,
+            limits=limits,
+            context_cues=args.context_cues,
         )
+        for issue in issues:
+            print(f"Warning: {args.input}:{issue.line}: {issue.message}")
         print(f"Processing complete. Output written to {result}")
+        print_memory_stats()
     except Exception as e:
         print(f"Error: {e}")
         exit(1)
@@ -0,0 +1,129 @@
+from openai import OpenAI
+import time
+
+from .retries import call_with_retries
+
+
+def _field(item, name):
+    """Read ``name`` from an SDK object or a plain dict."""
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+class TranscriptionBackend:
+    """
+    Turns one audio chunk into timed segments.
+
+    ``transcribe`` returns ``{"start", "end", "text"}`` dicts with times in seconds from the
+    start of the chunk, and must be safe to call from several threads at once.
+    ``cache_key`` names the backend and model for cache and checkpoint keys.
+    """
+
+    cache_key = None
+
+    def transcribe(self, file_path):
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Transcription through the OpenAI audio API, with retries on rate limits and transient errors."""
+
+    def __init__(self, api_key=None, model="whisper-1", max_retries=5):
+        # Retries are handled per chunk by call_with_retries
+        client_kwargs = {"max_retries": 0}
+        if api_key:
+            client_kwargs["api_key"] = api_key
+        self.client = OpenAI(**client_kwargs)
+        self.model = model
+        self.max_retries = max_retries
+        self.cache_key = f"openai:{model}"
+
+    def transcribe(self, file_path):
+        def request():
+            with open(file_path, "rb") as f:
+                return self.client.audio.transcriptions.create(
+                    model=self.model,
+                    file=f,
+                    response_format="verbose_json",  # needed for timestamps
+                )
+
+        result = call_with_retries(request, max_retries=self.max_retries)
+        return [
+            {
+                "start": _field(seg, "start"),
+                "end": _field(seg, "end"),
+                "text": _field(seg, "text").strip(),
+            }
+            for seg in _field(result, "segments") or []
+        ]
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """Local CPU transcription with faster-whisper (CTranslate2), int8-quantized by default."""
+
+    def __init__(self, model_size="small", compute_type="int8", cpu_threads=0, num_workers=1):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ImportError(
+                "faster-whisper is required for local transcription. Install it with 'pip install faster-whisper'."
+            )
+        # num_workers lets that many threads run transcribe() in parallel on one loaded model
+        self.model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
+        )
+        self.cache_key = f"faster-whisper:{model_size}:{compute_type}"
+
+    def transcribe(self, file_path):
+        segments, _ = self.model.transcribe(str(file_path))
+        return [
+            {"start": seg.start, "end": seg.end, "text": seg.text.strip()}
+            for seg in segments
+        ]
+
+
+class FakeTranscriptionBackend(TranscriptionBackend):
+    """
+    Deterministic offline stand-in: sleeps for a configurable latency and returns synthetic
+    segments of ``segment_ms`` covering the chunk, for load-testing chunking and reassembly.
+    """
+
+    cache_key = "fake"
+
+    def __init__(self, latency_s=0.5, latency_per_audio_minute_s=0.0, segment_ms=4000):
+        self.latency_s = latency_s
+        self.latency_per_audio_minute_s = latency_per_audio_minute_s
+        self.segment_ms = segment_ms
+
+    def transcribe(self, file_path):
+        from .audio_to_subtitle import probe_duration_ms
+
+        duration_ms = probe_duration_ms(str(file_path))
+        time.sleep(self.latency_s + self.latency_per_audio_minute_s * duration_ms / 60000)
+        return [
+            {
+                "start": start_ms / 1000,
+                "end": min(start_ms + self.segment_ms, duration_ms) / 1000,
+                "text": f"Synthetic segment at {start_ms} ms",
+            }
+            for start_ms in range(0, duration_ms, self.segment_ms)
+        ]
+
+
+def get_transcription_backend(name="openai", **kwargs):
+    """Build a backend by name: "openai", "local" (faster-whisper) or "fake"."""
+    backends = {
+        "openai": OpenAIWhisperBackend,
+        "local": FasterWhisperBackend,
+        "fake": FakeTranscriptionBackend,
+    }
+    if name not in backends:
+        raise ValueError(
+            f"Unknown transcription backend '{name}'. Expected one of: {', '.join(backends)}."
+        )
+    return backends[name](**kwargs)
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from .hashing import file_sha256
+
+
+def make_job_key(file_path, params):
+    """Identify a transcription job by the SHA-256 of the media bytes plus the parameters that shape its chunks."""
+    payload = json.dumps({"input": file_sha256(file_path), "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranscriptionCheckpointStore:
+    """
+    Local store of transcribed chunks, one JSON file per chunk under a directory per job.
+
+    A chunk is identified by its span start and end offsets, so a rerun of the same job
+    finds the chunks already transcribed (and billed) and only sends the missing ones.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _job_dir(self, job_key):
+        return os.path.join(self.root, job_key)
+
+    def _chunk_path(self, job_key, span_start_ms, span_end_ms):
+        end = "end" if span_end_ms is None else span_end_ms
+        return os.path.join(self._job_dir(job_key), f"{span_start_ms}_{end}.json")
+
+    def load(self, job_key, span_start_ms, span_end_ms):
+        """Return the saved segments of a chunk, or None if it has not been transcribed yet."""
+        try:
+            with open(
+                self._chunk_path(job_key, span_start_ms, span_end_ms), "r", encoding="utf-8"
+            ) as f:
+                return json.load(f)["segments"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, job_key, span_start_ms, span_end_ms, segments):
+        """Atomically save the segments of a transcribed chunk."""
+        os.makedirs(self._job_dir(job_key), exist_ok=True)
+        path = self._chunk_path(job_key, span_start_ms, span_end_ms)
+        fd, temp_path = tempfile.mkstemp(dir=self._job_dir(job_key), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"span_start_ms": span_start_ms, "segments": segments}, f)
+        os.replace(temp_path, path)
+
+    def completed_segments(self, job_key):
+        """All segments saved for a job so far, in time order."""
+        segments = []
+        try:
+            names = os.listdir(self._job_dir(job_key))
+        except OSError:
+            return segments
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self._job_dir(job_key), name), "r", encoding="utf-8") as f:
+                    segments.extend(json.load(f)["segments"])
+            except (OSError, ValueError, KeyError):
+                continue
+        segments.sort(key=lambda seg: seg["start_ms"])
+        return segments
+
+    def clear(self, job_key):
+        """Forget a job once its full result has been produced."""
+        shutil.rmtree(self._job_dir(job_key), ignore_errors=True)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store():
+    """
+    Return the process-wide TranscriptionCheckpointStore.
+
+    Located at TRANSCRIPTION_CHECKPOINT_DIR (default: a folder in the system temp directory).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            root = os.getenv("TRANSCRIPTION_CHECKPOINT_DIR") or os.path.join(
+                tempfile.gettempdir(), "tools_transcription_checkpoints"
+            )
+            _store = TranscriptionCheckpointStore(root)
+        return _store
@@ -0,0 +1,260 @@
+"""
+Asyncio engine for issuing many LLM requests against one provider as fast as it allows.
+
+Requests pass through a per-provider token bucket, then an AIMD concurrency limit that
+grows while the provider keeps up and halves on throttling, and are retried on rate
+limits and transient errors with Retry-After aware, jittered exponential backoff.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from openai import RateLimitError
+
+from .llm_clients import (
+    create_async_client,
+    create_completion,
+    completion_text,
+    completion_usage,
+)
+from .retries import RETRYABLE_ERRORS, retry_delay
+
+# Default request rates per provider (requests per second, burst); override with
+# <PROVIDER>_MAX_RPS and optionally cap token throughput with <PROVIDER>_MAX_TPM
+DEFAULT_RATE_LIMITS: Dict[str, float] = {
+    "dashscope": 10.0,
+    "openrouter": 10.0,
+    "openai": 10.0,
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at ``rate`` tokens per second up to ``capacity``.
+
+    Callers reserve tokens up front and sleep off any deficit, so waiters are served in
+    arrival order and one bucket can be shared by several event loops and threads.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` from the bucket and return how many seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Large requests may overdraw the bucket; they just wait longer
+            self._tokens -= min(tokens, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ProviderRateLimiter:
+    """Request-rate bucket plus an optional token-rate bucket for one provider."""
+
+    def __init__(self, requests_per_second: float, tokens_per_minute: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second))
+        self.tokens = (
+            TokenBucket(tokens_per_minute / 60, tokens_per_minute / 6)
+            if tokens_per_minute
+            else None
+        )
+
+    async def acquire(self, estimated_tokens: int = 0) -> None:
+        await self.requests.acquire()
+        if self.tokens is not None and estimated_tokens:
+            await self.tokens.acquire(estimated_tokens)
+
+
+_rate_limiters: Dict[str, ProviderRateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(router: str) -> ProviderRateLimiter:
+    """Return the process-wide rate limiter for ``router``, shared by every engine run."""
+    with _rate_limiters_lock:
+        if router not in _rate_limiters:
+            prefix = router.upper()
+            rps = float(
+                os.getenv(f"{prefix}_MAX_RPS") or DEFAULT_RATE_LIMITS.get(router, 10.0)
+            )
+            tpm = os.getenv(f"{prefix}_MAX_TPM")
+            _rate_limiters[router] = ProviderRateLimiter(rps, float(tpm) if tpm else None)
+        return _rate_limiters[router]
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on in-flight requests.
+
+    Each success adds about one slot per window of ``limit`` requests. A rate limit
+    halves the limit, and latency well above the best recently seen shrinks it by 10%;
+    decreases are spaced at least ``cooldown`` seconds apart so that one burst of
+    rejections only counts once.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 1.0,
+    ):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._changed = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(float(self.minimum), self.limit * factor)
+            self._last_decrease = now
+
+    def on_success(self, latency: float) -> None:
+        if self._baseline_latency is None:
+            self._baseline_latency = latency
+        else:
+            # Track the best latency, drifting slowly upward so the baseline can recover
+            self._baseline_latency = min(
+                latency, self._baseline_latency + 0.01 * (latency - self._baseline_latency)
+            )
+        if latency > self.latency_tolerance * self._baseline_latency:
+            self._decrease(0.9)
+        else:
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        self._decrease(0.5)
+
+
+class TranslationEngine:
+    """
+    Issues completion requests to one provider with rate limiting, adaptive concurrency
+    and retries. Use as ``async with TranslationEngine(...) as engine`` inside one event loop.
+
+    Args:
+        router: Provider name ("dashscope", "openrouter", "openai")
+        model: Model to request
+        system: System prompt sent with every request
+        api_key: API key, defaults to the provider's environment variable
+        max_concurrency: Upper bound on requests in flight
+        initial_concurrency: Requests in flight before the limit adapts
+        max_retries: Retries per request on rate limits and transient errors
+        rate_limiter: Shared limiter, defaults to the process-wide one for the provider
+    """
+
+    def __init__(
+        self,
+        router: str,
+        model: str,
+        system: str,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 64,
+        initial_concurrency: int = 4,
+        max_retries: int = 6,
+        rate_limiter: Optional[ProviderRateLimiter] = None,
+    ):
+        self.router = router
+        self.model = model
+        self.system = system
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or get_rate_limiter(router)
+        self.concurrency = AdaptiveConcurrency(
+            initial=min(initial_concurrency, max_concurrency), maximum=max_concurrency
+        )
+        self.client = None
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.peak_concurrency = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+
+    async def __aenter__(self):
+        self.client = create_async_client(
+            self.router, api_key=self.api_key, max_connections=self.concurrency.maximum
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.close()
+        self.client = None
+
+    async def complete(self, prompt: str, max_tokens: int = 1024, estimated_tokens: int = 0) -> str:
+        """Send ``prompt`` and return the reply text, retrying throttled and transient failures."""
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(estimated_tokens)
+            async with self.concurrency:
+                self.peak_concurrency = max(self.peak_concurrency, self.concurrency.in_flight)
+                started = time.monotonic()
+                try:
+                    response = await create_completion(
+                        self.client, self.router, self.model, self.system, prompt, max_tokens
+                    )
+                except RETRYABLE_ERRORS as e:
+                    if isinstance(e, RateLimitError):
+                        self.throttled += 1
+                        self.concurrency.on_throttle()
+                    if attempt == self.max_retries:
+                        raise
+                    error = e
+                else:
+                    self.concurrency.on_success(time.monotonic() - started)
+                    # Only completed requests count; failed attempts are counted as retries
+                    self.requests += 1
+                    input_tokens, output_tokens, cached_tokens = completion_usage(response)
+                    self.input_tokens += input_tokens
+                    self.output_tokens += output_tokens
+                    self.cached_tokens += cached_tokens
+                    return completion_text(response)
+            # Back off outside the concurrency slot so other requests can proceed
+            self.retries += 1
+            await asyncio.sleep(retry_delay(error, attempt))
+
+    def stats(self) -> Dict[str, float]:
+        """Request, retry, throttling and token counters plus the current concurrency limit."""
+        return {
+            "requests": self.requests,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "concurrency_limit": int(self.concurrency.limit),
+            "peak_concurrency": self.peak_concurrency,
+        }
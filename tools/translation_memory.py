@@ -0,0 +1,202 @@
+"""
+SQLite translation memory: translated subtitle texts keyed on the normalized source text,
+target language, model and provider, so repeated lines are never sent to the API twice.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    key TEXT PRIMARY KEY,
+    translation TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+)
+"""
+
+
+def normalize_source(text: str) -> str:
+    """Canonical form of a source text: NFC, whitespace collapsed within lines, blank lines dropped."""
+    text = unicodedata.normalize("NFC", text)
+    lines = (re.sub(r"\s+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class TranslationMemory:
+    """
+    Translations stored in one SQLite table, expired after ``ttl_seconds`` and evicted
+    least-recently-used first once the stored texts exceed ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = 30 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(SCHEMA)
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)"
+            )
+
+    def make_key(self, text: str, target_lang: str, model: str, router: str) -> str:
+        payload = json.dumps(
+            {
+                "source": normalize_source(text),
+                "target_lang": target_lang,
+                "model": model,
+                "router": router,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired_before(self, now: float) -> float:
+        return now - self.ttl_seconds if self.ttl_seconds else float("-inf")
+
+    def get_many(
+        self, texts: List[str], target_lang: str, model: str, router: str
+    ) -> Dict[int, str]:
+        """Look up ``texts``; returns {position: translation} for the ones remembered."""
+        keys = [self.make_key(text, target_lang, model, router) for text in texts]
+        now = time.time()
+        found: Dict[str, str] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start : start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, translation FROM translations "
+                    f"WHERE created >= ? AND key IN ({','.join('?' * len(batch))})",
+                    [self._expired_before(now), *batch],
+                ).fetchall()
+                found.update(rows)
+            with self._db:
+                self._db.executemany(
+                    "UPDATE translations SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+            result = {i: found[key] for i, key in enumerate(keys) if key in found}
+            self.hits += len(result)
+            self.misses += len(keys) - len(result)
+        return result
+
+    def put_many(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        target_lang: str,
+        model: str,
+        router: str,
+    ) -> None:
+        """Remember (source text, translation) pairs, then evict down to the limits."""
+        now = time.time()
+        rows = [
+            (
+                self.make_key(text, target_lang, model, router),
+                translation,
+                now,
+                now,
+                len(translation.encode("utf-8")),
+            )
+            for text, translation in pairs
+        ]
+        with self._lock:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)", rows
+                )
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then least-recently-used ones until under ``max_bytes``."""
+        with self._lock:
+            with self._db:
+                removed = self._db.execute(
+                    "DELETE FROM translations WHERE created < ?",
+                    (self._expired_before(time.time()),),
+                ).rowcount
+                total = self._db.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM translations"
+                ).fetchone()[0]
+                if total > self.max_bytes:
+                    cursor = self._db.execute(
+                        "SELECT key, size FROM translations ORDER BY accessed"
+                    )
+                    stale = []
+                    for key, size in cursor:
+                        if total <= self.max_bytes:
+                            break
+                        stale.append((key,))
+                        total -= size
+                    self._db.executemany("DELETE FROM translations WHERE key = ?", stale)
+                    removed += len(stale)
+            self.evictions += removed
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the current size of the memory."""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM translations"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory:
+    """
+    Return the process-wide TranslationMemory.
+
+    Stored at TRANSLATION_MEMORY_PATH (default: a file in the system temp directory), with
+    entries kept TRANSLATION_MEMORY_TTL_DAYS days (default: 30, 0 keeps them forever) and
+    capped at TRANSLATION_MEMORY_MAX_MB megabytes (default: 256).
+    """
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            path = os.getenv("TRANSLATION_MEMORY_PATH") or os.path.join(
+                tempfile.gettempdir(), "tools_translation_memory.sqlite3"
+            )
+            ttl_days = float(os.getenv("TRANSLATION_MEMORY_TTL_DAYS", "30"))
+            max_mb = int(os.getenv("TRANSLATION_MEMORY_MAX_MB", "256"))
+            _memory = TranslationMemory(
+                path,
+                ttl_seconds=ttl_days * 24 * 3600 or None,
+                max_bytes=max_mb * 1024 * 1024,
+            )
+        return _memory
@@ -0,0 +1,107 @@
+"""
+UNO client for one headless soffice daemon, run as a helper process.
+
+The LibreOffice Python-UNO bridge is usually installed for the system interpreter only
+(the ``python3-uno`` package), not for the virtualenv the app runs in, so OfficeInstance
+starts this script under whichever interpreter can ``import uno`` and talks to it over
+stdin/stdout. It depends on nothing but the standard library and ``uno``.
+
+Protocol: one JSON object per line in each direction. Requests carry a ``command``
+(``connect``, ``ping``, ``convert`` or ``terminate``); every request gets exactly one
+``{"ok": true}`` or ``{"ok": false, "error": "..."}`` reply.
+
+Usage: python3 uno_bridge.py PORT
+"""
+
+import json
+import os
+import sys
+
+import uno
+
+# Export filters by the document service LibreOffice reports for the loaded file
+PDF_EXPORT_FILTERS = {
+    "com.sun.star.presentation.PresentationDocument": "impress_pdf_Export",
+    "com.sun.star.text.TextDocument": "writer_pdf_Export",
+    "com.sun.star.sheet.SpreadsheetDocument": "calc_pdf_Export",
+    "com.sun.star.drawing.DrawingDocument": "draw_pdf_Export",
+}
+
+
+def _properties(**values):
+    props = []
+    for name, value in values.items():
+        prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def connect(port):
+    """Resolve the daemon listening on ``port`` and return its Desktop."""
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_context
+    )
+    context = resolver.resolve(
+        f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+    )
+    return context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.frame.Desktop", context
+    )
+
+
+def convert_to_pdf(desktop, input_path, output_path):
+    """Load ``input_path`` hidden in the daemon and export it to ``output_path`` as PDF."""
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(os.path.abspath(input_path)),
+        "_blank",
+        0,
+        _properties(Hidden=True, ReadOnly=True),
+    )
+    if document is None:
+        raise RuntimeError(f"LibreOffice could not open {input_path}")
+    try:
+        for service, filter_name in PDF_EXPORT_FILTERS.items():
+            if document.supportsService(service):
+                break
+        else:
+            raise RuntimeError(f"No PDF export filter for {input_path}")
+        document.storeToURL(
+            uno.systemPathToFileUrl(os.path.abspath(output_path)),
+            _properties(FilterName=filter_name),
+        )
+    finally:
+        document.close(True)
+
+
+def main(port):
+    desktop = None
+    for line in sys.stdin:
+        request = json.loads(line)
+        command = request.get("command")
+        try:
+            if command == "connect":
+                desktop = connect(port)
+            elif desktop is None:
+                raise RuntimeError("Not connected to the LibreOffice daemon")
+            elif command == "ping":
+                desktop.getComponents()
+            elif command == "convert":
+                convert_to_pdf(desktop, request["input"], request["output"])
+            elif command == "terminate":
+                desktop.terminate()
+            else:
+                raise ValueError(f"Unknown command: {command!r}")
+            reply = {"ok": True}
+        except Exception as e:
+            reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+        if command == "terminate":
+            return
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]))